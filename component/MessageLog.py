@@ -0,0 +1,120 @@
+from datetime import datetime
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, QTimer
+
+HEADERS = ('时间', '类型', '状态', '详细信息')
+
+
+class MessageLogModel(QAbstractTableModel):
+    """消息日志表格模型
+
+    消息保存在固定容量的环形缓冲区中，超出容量时丢弃最旧的消息。append 只把消息放入待处理列表，
+    由定时器每隔 interval 毫秒批量加入表格，一批消息只触发一次 rowsInserted。
+    """
+
+    def __init__(self, capacity=5000, interval=100, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.rows = [None] * capacity  # 环形缓冲区，每行为 (时间, 类型, 状态, 详细信息)
+        self.start = 0  # 最旧一行在缓冲区中的位置
+        self.count = 0
+        self.pending = []
+        self.dropped = 0  # 因超出容量而丢弃的消息数
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    def append(self, message):
+        """添加一条消息（字符串或 PacketLogRecord），在下一次定时刷新时显示"""
+        self.pending.append((datetime.now(), message))
+
+    def extend(self, messages):
+        """添加一批消息"""
+        received_at = datetime.now()
+        self.pending.extend((received_at, message) for message in messages)
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = [None] * self.capacity
+        self.start = 0
+        self.count = 0
+        self.pending.clear()
+        self.endResetModel()
+
+    def flush(self):
+        """把待处理的消息批量加入表格"""
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        if len(pending) > self.capacity:
+            self.dropped += len(pending) - self.capacity
+            pending = pending[-self.capacity:]
+        new_rows = [self.format_row(received_at, message) for received_at, message in pending]
+
+        # 先移除放不下的最旧行，再一次性插入新行
+        overflow = self.count + len(new_rows) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for i in range(overflow):
+                self.rows[(self.start + i) % self.capacity] = None
+            self.start = (self.start + overflow) % self.capacity
+            self.count -= overflow
+            self.dropped += overflow
+            self.endRemoveRows()
+
+        first = self.count
+        self.beginInsertRows(QModelIndex(), first, first + len(new_rows) - 1)
+        for i, row in enumerate(new_rows):
+            self.rows[(self.start + first + i) % self.capacity] = row
+        self.count += len(new_rows)
+        self.endInsertRows()
+
+    @staticmethod
+    def format_row(received_at, message):
+        # 封包日志记录在这里才格式化为文本
+        parts = str(message).split('|', 2)
+        parts += [''] * (3 - len(parts))
+        return (received_at.strftime("%m-%d %H:%M:%S"), parts[0], parts[1], parts[2])
+
+    def row(self, row):
+        return self.rows[(self.start + row) % self.capacity]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role in (Qt.DisplayRole, Qt.ToolTipRole) and index.isValid() and index.row() < self.count:
+            return self.row(index.row())[index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+
+class MessageFilterProxyModel(QSortFilterProxyModel):
+    """按类型、状态列筛选消息，筛选条件为空时显示全部"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.type_filter = ''
+        self.status_filter = ''
+
+    def set_type_filter(self, text):
+        self.type_filter = text.strip()
+        self.invalidateFilter()
+
+    def set_status_filter(self, text):
+        self.status_filter = text.strip()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.type_filter and not self.status_filter:
+            return True
+        row = self.sourceModel().row(source_row)
+        return self.type_filter in row[1] and self.status_filter in row[2]
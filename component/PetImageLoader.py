@@ -0,0 +1,148 @@
+import logging, os, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from PySide6.QtCore import QCoreApplication, QObject, Qt, Signal
+from PySide6.QtGui import QColor, QImage
+
+logger = logging.getLogger(__name__)
+
+HEAD_URL = "http://seerh5.61.com/resource/assets/pet/head/"
+CACHE_DIR = os.path.join('cache', 'pet_heads')
+
+
+class PetImageLoader(QObject):
+    """精灵头像加载器
+
+    下载和解码都在线程池中完成，界面线程只接收缩放好的 QImage。同一只精灵只下载一次，
+    原始图片按精灵ID保存在磁盘缓存中，缩放后的图片按 (精灵ID, 尺寸) 保存在内存 LRU 中。
+    """
+
+    imageReady = Signal(str, int, QImage)  # 精灵ID, 尺寸, 缩放后的图片
+    _decoded = Signal(str, int, QImage)  # 工作线程 -> 界面线程
+
+    def __init__(self, base_url=HEAD_URL, cache_dir=CACHE_DIR, max_workers=4, memory_capacity=128, timeout=(3, 10), parent=None):
+        super().__init__(parent)
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.memory_capacity = memory_capacity
+        self.memory = OrderedDict()  # (精灵ID, 尺寸) -> QImage，只在界面线程访问
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pet-image')
+        self.lock = threading.Lock()
+        self.pending = {}  # 精灵ID -> 等待中的尺寸集合
+        self._decoded.connect(self._on_decoded, Qt.QueuedConnection)
+
+    def cached(self, pet_id, size):
+        """内存中已有的缩放图片，没有时返回 None"""
+        image = self.memory.get((pet_id, size))
+        if image is not None:
+            self.memory.move_to_end((pet_id, size))
+        return image
+
+    def request(self, pet_id, size):
+        """请求精灵头像，内存中已有时直接返回，否则在后台加载，完成后发出 imageReady"""
+        image = self.cached(pet_id, size)
+        if image is not None:
+            return image
+        with self.lock:
+            if pet_id in self.pending:
+                self.pending[pet_id].add(size)
+                return None
+            self.pending[pet_id] = {size}
+        self.executor.submit(self._load, pet_id)
+        return None
+
+    def shutdown(self):
+        """取消尚未开始的加载并关闭连接"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def _cache_path(self, pet_id):
+        return os.path.join(self.cache_dir, f'{pet_id}.png')
+
+    def _fetch(self, pet_id):
+        path = self._cache_path(pet_id)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            pass
+        response = self.session.get(f'{self.base_url}{pet_id}.png', timeout=self.timeout)
+        response.raise_for_status()
+        data = response.content
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f'{path}.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.debug("Failed to cache pet image %s: %s", pet_id, e)
+        return data
+
+    def _load(self, pet_id):
+        image = QImage()
+        try:
+            # 精灵ID 同时用作缓存文件名，只接受数字
+            if not pet_id.isdigit():
+                raise ValueError(f"invalid pet id {pet_id!r}")
+            image.loadFromData(self._fetch(pet_id))
+            if image.isNull():
+                raise ValueError("image data cannot be decoded")
+        except Exception as e:
+            logger.warning("Error loading image for pet %s: %s", pet_id, e)
+            with self.lock:
+                self.pending.pop(pet_id, None)
+            return
+        # 加载期间可能又有新的尺寸加入，直到没有新的尺寸为止
+        done = set()
+        while True:
+            with self.lock:
+                sizes = self.pending[pet_id] - done
+                if not sizes:
+                    del self.pending[pet_id]
+                    return
+            for size in sizes:
+                scaled = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                self._decoded.emit(pet_id, size, scaled)
+            done |= sizes
+
+    def _on_decoded(self, pet_id, size, image):
+        self.memory[(pet_id, size)] = image
+        self.memory.move_to_end((pet_id, size))
+        while len(self.memory) > self.memory_capacity:
+            self.memory.popitem(last=False)
+        self.imageReady.emit(pet_id, size, image)
+
+
+_placeholders = {}
+
+
+def placeholder_image(size):
+    """图片加载完成前显示的占位图"""
+    image = _placeholders.get(size)
+    if image is None:
+        image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        image.fill(QColor(128, 128, 128, 40))
+        _placeholders[size] = image
+    return image
+
+
+_loader = None
+
+
+def get_pet_image_loader():
+    """所有精灵卡片共享的加载器，需在界面线程中第一次调用"""
+    global _loader
+    if _loader is None:
+        _loader = PetImageLoader()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_loader.shutdown)
+    return _loader
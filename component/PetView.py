@@ -1,40 +1,39 @@
-import requests
-from PySide6.QtGui import QPixmap
+from PySide6.QtGui import QImage
 from PySide6.QtWidgets import QVBoxLayout
 from qfluentwidgets import SimpleCardWidget, ImageLabel
 
+from component.PetImageLoader import get_pet_image_loader, placeholder_image
+
 
 class PetCard(SimpleCardWidget):
-    def __init__(self, petId, parent=None):
+    def __init__(self, petId, parent=None, size=80):
         super().__init__(parent=parent)
-        self.headAddress = "http://seerh5.61.com/resource/assets/pet/head/"
+        self.imageSize = size
+        self.petId = "NULL"
         self.imgWidget = ImageLabel()
         self.vBoxLayout = QVBoxLayout(self)
         self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
         self.vBoxLayout.setSpacing(0)
 
-        self.load_image_from_url(petId)
-        self.imgWidget.setFixedSize(80, 80)
+        # 图片在后台加载，完成前显示占位图
+        self.loader = get_pet_image_loader()
+        self.loader.imageReady.connect(self.on_image_ready)
+        self.set_pet(petId)
         self.vBoxLayout.addWidget(self.imgWidget)
 
-    def load_image_from_url(self, petId):
-        if petId != "NULL":
-            url = self.headAddress + petId + ".png"
-            try:
-                # 从 URL 下载图片
-                response = requests.get(url)
-                image_data = response.content
+    def set_pet(self, petId):
+        """切换显示的精灵"""
+        self.petId = petId
+        if petId == "NULL":
+            self.set_image(QImage())
+            return
+        image = self.loader.request(petId, self.imageSize)
+        self.set_image(image if image is not None else placeholder_image(self.imageSize))
 
-                # 将图片数据加载为 QPixmap
-                pixmap = QPixmap()
-                pixmap.loadFromData(image_data)
+    def set_image(self, image):
+        self.imgWidget.setImage(image)
+        self.imgWidget.setFixedSize(self.imageSize, self.imageSize)
 
-                # 设置 QLabel 显示图片
-                self.imgWidget.setPixmap(pixmap)
-                self.imgWidget.setScaledContents(True)  # 缩放图片以适应 QLabel 大小
-                self.imgWidget.setFixedSize(80, 80)
-            except Exception as e:
-                print("Error loading image:", e)
-        else:
-            self.imgWidget.setPixmap(None)
-            self.imgWidget.setFixedSize(80, 80)
\ No newline at end of file
+    def on_image_ready(self, petId, size, image):
+        if petId == self.petId and size == self.imageSize:
+            self.set_image(image)
@@ -0,0 +1,265 @@
+import asyncio, inspect, logging, threading
+from function.Algorithms import Algorithms
+from .Login import Login
+from .SendPacketProcessing import SendPacketProcessing
+from .SendPipeline import SendPipeline
+from .ReceivePacketAnalysis import ReceivePacketAnalysis
+from .PetFightPacketManager import PetFightPacketManager, Send, Sleep, Request
+from .PacketTemplate import as_packet
+from .PetTimestampCache import PetTimestampCache
+from .ServerSelector import configured_server
+from .config_manager import config_manager
+from .log_manager import configured_level
+from .DailyTasks import BATTLE_TASKS, BATTLE_TEAM, DAILY_TASKS
+
+logger = logging.getLogger(__name__)
+
+
+class GameProtocol(asyncio.BufferedProtocol):
+    """游戏连接的 asyncio 协议，数据直接读入分帧器的缓冲区，完整封包交给 ReceivePacketAnalysis 处理"""
+
+    def __init__(self, receive_packet_analysis: ReceivePacketAnalysis, connection_lost_callback=None):
+        self.receive_packet_analysis = receive_packet_analysis
+        self.framer = receive_packet_analysis.framer
+        self.connection_lost_callback = connection_lost_callback
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        return self.framer.get_buffer()
+
+    def buffer_updated(self, nbytes):
+        self.framer.commit(nbytes)
+        try:
+            for frame in self.framer.frames():
+                self.receive_packet_analysis.handle_frame(frame)
+        except Exception as e:
+            if self.receive_packet_analysis.message_callback:
+                self.receive_packet_analysis.message_callback(f"接收|错误|{str(e)}")
+            self.transport.close()
+
+    def connection_lost(self, exc):
+        self.receive_packet_analysis.dispatcher.cancel_all()
+        if self.connection_lost_callback:
+            self.connection_lost_callback(exc)
+
+
+class AsyncGameConnection:
+    """基于 asyncio 的游戏连接，多个账号可以共用一个事件循环"""
+
+    def __init__(self, userid, message_callback=None, disconnect_callback=None, read_size=4096, log_level=None):
+        if log_level is None:
+            log_level = configured_level(config_manager)
+        self.userid = userid
+        self.message_callback = message_callback
+        self.disconnect_callback = disconnect_callback
+        self.algorithms = Algorithms()
+        self.login = Login(self.algorithms)
+        self.receive_packet_analysis = ReceivePacketAnalysis(self.algorithms, userid, message_callback,
+                                                             read_size = read_size, log_level = log_level)
+        self.send_packet_processing = None
+        self.send_pipeline = None
+        self.pet_fight_packet_manager = None
+        self.transport = None
+        self.closed = False
+
+    async def connect(self, password, server=None, timeout=10):
+        """登录验证并连接游戏服务器，等待 1001 密钥初始化完成；未指定服务器时按设置选择"""
+        loop = asyncio.get_running_loop()
+        if server is None:
+            server = configured_server(self.message_callback)
+        # 登录验证仍是阻塞的 HTTP/TCP 请求，放到线程池中执行
+        userid_bytes, recv_body = await loop.run_in_executor(None, self.login.verify, self.userid, password)
+        host, port = self.login.get_game_server(server)
+        with self.login.phase('connect'):
+            self.transport, _ = await asyncio.wait_for(
+                loop.create_connection(lambda: GameProtocol(self.receive_packet_analysis, self._connection_lost), host, port),
+                timeout)
+        # 同一轮事件循环中发出的封包合并写出
+        self.send_pipeline = SendPipeline(self.transport)
+        self.send_packet_processing = SendPacketProcessing(self.algorithms, self.send_pipeline, self.userid, self.message_callback)
+        self.pet_fight_packet_manager = AsyncPetFightPacketManager(self, self.message_callback,
+                                                                   timestamp_cache = PetTimestampCache.for_account(self.userid))
+        key_ready = self.receive_packet_analysis.expect(1001)
+        self.transport.write(self.login.LOGIN_IN(userid_bytes, recv_body))
+        try:
+            with self.login.phase('key'):
+                await asyncio.wait_for(asyncio.wrap_future(key_ready), timeout)
+        except asyncio.TimeoutError:
+            self.close()
+            raise ConnectionError("等待 1001 响应超时")
+        self.login.report_timings(self.userid)
+
+    def send(self, packet):
+        """发送一个封包（十六进制字符串或封包模板）"""
+        if self.closed or not self.send_packet_processing:
+            raise ConnectionError("未连接到服务器")
+        self.send_packet_processing.SendPacket(packet)
+
+    async def request(self, packet, command_id, timeout=3, predicate=None):
+        """发送封包并等待指定命令号的响应，超时返回 None，连接断开时抛出 ConnectionError"""
+        future = self.receive_packet_analysis.expect(command_id, predicate)
+        try:
+            self.send(packet)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            if self.message_callback:
+                self.message_callback(f"等待|超时|命令 {command_id} 响应超时")
+            return None
+        except asyncio.CancelledError:
+            # 连接断开时 dispatcher 会取消所有等待者
+            if self.closed:
+                raise ConnectionError("连接已断开")
+            raise
+        finally:
+            self.receive_packet_analysis.dispatcher.discard(command_id, future)
+
+    async def execute_daily_tasks(self):
+        """依次执行设置中未禁止的日常任务，返回每个任务的结果
+
+        第一个战斗任务之前把背包调整为出战精灵，调整失败时不执行战斗任务。
+        """
+        if not self.pet_fight_packet_manager:
+            return "请先登录并初始化"
+
+        daily_settings = config_manager.get_daily_settings()
+        results = []
+        team_ready = None
+        for setting, task_name, method_name in DAILY_TASKS:
+            if daily_settings.get(setting) != '禁止':
+                if setting in BATTLE_TASKS:
+                    if team_ready is None:
+                        try:
+                            team_ready = await self.pet_fight_packet_manager.prepare_team(BATTLE_TEAM)
+                        except Exception as e:
+                            team_ready = False
+                            results.append(f"出战精灵：× ({str(e)})")
+                        else:
+                            results.append(f"出战精灵：{'√' if team_ready else '× (背包精灵未就位)'}")
+                    if not team_ready:
+                        results.append(f"{task_name}：× (出战精灵未就位)")
+                        continue
+                task_function = getattr(self.pet_fight_packet_manager, method_name) if method_name else None
+                try:
+                    await task_function()
+                    results.append(f"{task_name}：√")
+                except Exception as e:
+                    results.append(f"{task_name}：× ({str(e)})")
+                await asyncio.sleep(0.3)
+
+        return "\n".join(results)
+
+    def close(self):
+        """写出排队的封包后关闭连接，需在事件循环线程中调用"""
+        if self.send_pipeline:
+            self.send_pipeline.flush()
+            logger.debug('发送统计 %d: %s', self.userid, self.send_pipeline.stats())
+        if self.transport:
+            self.transport.close()
+
+    def _connection_lost(self, exc):
+        self.closed = True
+        if self.message_callback:
+            self.message_callback("连接|断开|服务器断开连接")
+        if self.disconnect_callback:
+            self.disconnect_callback()
+
+
+class AsyncPetFightPacketManager(PetFightPacketManager):
+    """PetFightPacketManager 的异步版本，各流程方法返回协程"""
+
+    def __init__(self, connection: AsyncGameConnection, message_callback=None, pacing=True, timestamp_cache=None):
+        super().__init__(connection.send_packet_processing, connection.receive_packet_analysis, message_callback, pacing,
+                         timestamp_cache = timestamp_cache)
+        self.connection = connection
+
+    async def run_steps(self, steps):
+        """在事件循环中依次执行流程的各个步骤"""
+        value = None
+        token = None  # 上一次发送的节奏记录
+        while True:
+            try:
+                step = steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+            value = None
+            if isinstance(step, Send):
+                packet = as_packet(step.packet)
+                if self.pacer:
+                    token = self.pacer.before_send(packet.command_id)
+                self.connection.send(packet)
+            elif isinstance(step, Sleep):
+                if self.pacer:
+                    await self.pacer.wait_async(token, step.seconds)
+                else:
+                    await asyncio.sleep(step.seconds)
+            elif isinstance(step, Request):
+                value = await self.connection.request(step.packet, step.command_id, step.timeout)
+                if self.pacer:
+                    token = self.pacer.completed()
+            else:
+                raise TypeError(f"Unknown step: {step!r}")
+
+
+class EventLoopThread:
+    """在后台线程中运行的事件循环，供 Qt 界面等同步代码提交协程"""
+
+    def __init__(self, name='asyncio-loop'):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro, callback=None):
+        """提交协程，返回 concurrent.futures.Future；callback 在事件循环线程中以 Future 为参数调用"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if callback:
+            future.add_done_callback(callback)
+        return future
+
+    def run(self, coro, timeout=None):
+        """提交协程并等待结果，超时时取消协程；不能在事件循环线程中调用"""
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("不能在事件循环线程中等待协程")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def call(self, func, *args):
+        """在事件循环线程中调用 func，返回值是协程时等待它完成，返回 concurrent.futures.Future"""
+        async def call():
+            result = func(*args)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        return self.submit(call())
+
+    def call_soon(self, func, *args):
+        """在事件循环线程中调用普通函数（如 AsyncGameConnection.send）"""
+        self.loop.call_soon_threadsafe(func, *args)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+_loop_thread = None
+_loop_thread_lock = threading.Lock()
+
+
+def get_event_loop_thread():
+    """进程内共享的事件循环线程，所有账号的连接都在其中运行"""
+    global _loop_thread
+    with _loop_thread_lock:
+        if _loop_thread is None:
+            _loop_thread = EventLoopThread()
+        return _loop_thread
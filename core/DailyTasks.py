@@ -0,0 +1,20 @@
+# 一键日常的任务：(设置项, 任务名, PetFightPacketManager 的方法名)，方法名为 None 的任务暂未实现
+DAILY_TASKS = [
+    ('daily_check_in', '日常签到', 'daily_props_collection'),
+    ('a', '刻印抽奖', 'engraved_raffle_machine'),
+    ('b', 'VIP礼包', 'vip_package'),
+    ('c', '战队日常', 'team_contribution'),
+    ('d', '六界神王殿', None),
+    ('e', '经验战场', 'experience_training_ground'),
+    ('f', '学习力战场', 'learning_training_ground'),
+    ('g', '勇者之塔', 'brave_tower'),
+    ('h', '泰坦矿洞', 'titan_mines'),
+    ('i', '泰坦源脉', 'titan_vein'),
+    ('j', '精灵王试炼', 'trial_of_the_elf_king'),
+    ('k', 'X战队密室', 'x_team_chamber'),
+    ('l', '星愿漂流瓶许愿', 'make_a_wish'),
+]
+
+# 需要先把背包调整为出战精灵的战斗任务：经验战场、学习力战场、勇者之塔、泰坦矿洞、泰坦源脉、精灵王试炼、X战队密室
+BATTLE_TASKS = frozenset({'e', 'f', 'g', 'h', 'i', 'j', 'k'})
+BATTLE_TEAM = '84'  # 战斗任务使用的出战精灵预设（表姐、六界、艾欧），见 TEAM_PRESETS
@@ -1,45 +1,107 @@
-import hashlib, requests, socket, struct
+import hashlib, logging, socket, struct, threading, time
+from contextlib import contextmanager
 from function.Algorithms import Algorithms
 
+logger = logging.getLogger(__name__)
+
+GATEWAY_URL = r'http://seer.61.com.tw/config/ip.txt'
+GATEWAY_TTL = 300  # 登录服务器地址的缓存时间（秒）
+HTTP_TIMEOUT = (3, 5)  # (连接, 读取) 超时（秒）
+CONNECT_TIMEOUT = 5  # 登录服务器、游戏服务器的连接超时（秒）
+READ_TIMEOUT = 10  # 登录服务器的响应超时（秒）
+SLOW_LOGIN = 5  # 登录总耗时超过该值（秒）时以警告级别记录
+
+GAME_SERVER_HOST = '210.68.8.39'
+# 服务器编号 -> 游戏服务器端口
+SERVER_PORTS = {
+    1: 1241, 2: 1242, 3: 1243, 4: 1244, 5: 1245, 6: 1246, 7: 1247, 8: 1248, 9: 1249, 10: 1250,
+    11: 1251, 12: 1252, 13: 1253, 14: 1254, 15: 1255, 16: 1256, 17: 1257, 18: 1258, 19: 1259, 20: 1260,
+    21: 1221, 22: 1222, 23: 1223, 24: 1224, 25: 1225, 26: 1226, 27: 1227, 28: 1228, 29: 1229, 30: 1230,
+    31: 1231, 32: 1232, 33: 1233, 34: 1234, 35: 1235, 36: 1236, 37: 1237, 38: 1238, 39: 1239, 40: 1240
+}
+
+PHASE_NAMES = {'gateway': '获取地址', 'verify': '登录验证', 'connect': '连接游戏服务器', 'key': '1001 密钥初始化'}
+
+_session = None
+_gateway = None  # (登录服务器地址, 过期时间)
+_lock = threading.Lock()
+_fetch_lock = threading.Lock()  # 同时登录的多个账号只请求一次地址
+
+
+def http_session():
+    """所有账号共用的 HTTP 会话，复用连接"""
+    global _session
+    with _lock:
+        if _session is None:
+            # 第一次登录时才导入 requests，不拖慢程序启动
+            import requests
+            _session = requests.Session()
+        return _session
+
+
+def invalidate_server_addr():
+    """丢弃缓存的登录服务器地址，下次登录时重新获取"""
+    global _gateway
+    with _lock:
+        _gateway = None
+
+
 class Login():
     def __init__(self, algorithms: Algorithms):
         self.algorithms = algorithms
-        self.serverList = {
-        1: 1241, 2: 1242, 3: 1243, 4: 1244, 5: 1245, 6: 1246, 7: 1247, 8: 1248, 9: 1249, 10: 1250, 
-        11: 1251, 12: 1252, 13: 1253, 14: 1254, 15: 1255, 16: 1256, 17: 1257, 18: 1258, 19: 1259, 20: 1260, 
-        21: 1221, 22: 1222, 23: 1223, 24: 1224, 25: 1225, 26: 1226, 27: 1227, 28: 1228, 29: 1229, 30: 1230, 
-        31: 1231, 32: 1232, 33: 1233, 34: 1234, 35: 1235, 36: 1236, 37: 1237, 38: 1238, 39: 1239, 40: 1240
-        }
-
-    def login(self, userid, password, server=32):
+        self.timings = {}  # 登录各阶段耗时（秒），见 PHASE_NAMES
+        self.serverList = SERVER_PORTS
+
+    @contextmanager
+    def phase(self, name):
+        """记录一个登录阶段的耗时"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - begin
+
+    def report_timings(self, userid):
+        """记录本次登录各阶段的耗时，总耗时超过 SLOW_LOGIN 时以警告级别记录"""
+        total = sum(self.timings.values())
+        detail = ', '.join(f'{PHASE_NAMES.get(name, name)} {seconds * 1000:.0f}ms' for name, seconds in self.timings.items())
+        logger.log(logging.WARNING if total > SLOW_LOGIN else logging.INFO, '登录耗时 %d: %.0fms (%s)', userid, total * 1000, detail)
+
+    def verify(self, userid, password):
+        """登录验证，返回 (米米号字节, 登录凭证)"""
+        self.timings.clear()
         double_md5_password = self.double_md5(password)
         # 获取登录凭证
         recv_data = self.login_verify(userid, double_md5_password)
         recv_body = recv_data[21:37]
         userid_bytes =recv_data[9:13]
-        try:
-            self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.tcp_socket.connect(('210.68.8.39', self.serverList[server]))
-            self.tcp_socket.send(self.LOGIN_IN(userid_bytes, recv_body))
-            return self.tcp_socket
-        except KeyboardInterrupt:
-            if self.tcp_socket:
-                self.tcp_socket.close()
-            print('断开连接')
+        return userid_bytes, recv_body
+
+    def get_game_server(self, server):
+        """返回游戏服务器地址"""
+        return (GAME_SERVER_HOST, self.serverList[server])
 
     def get_server_addr(self):
-        url = r'http://seer.61.com.tw/config/ip.txt'
-        r = requests.get(url)
-        server_addr = r.text.split('|')[0].split(':')
-        return (server_addr[0], int(server_addr[1]))
+        """返回登录服务器地址，GATEWAY_TTL 秒内复用上次获取的结果"""
+        global _gateway
+        with _fetch_lock:
+            with _lock:
+                if _gateway is not None and _gateway[1] > time.monotonic():
+                    return _gateway[0]
+            r = http_session().get(GATEWAY_URL, timeout = HTTP_TIMEOUT)
+            r.raise_for_status()
+            server_addr = r.text.split('|')[0].split(':')
+            server_addr = (server_addr[0].strip(), int(server_addr[1]))
+            with _lock:
+                _gateway = (server_addr, time.monotonic() + GATEWAY_TTL)
+            return server_addr
 
     def send_login_packet(self, server_addr, send_data):
-        tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        print(server_addr)
-        tcp_socket.connect(server_addr)
-        tcp_socket.send(send_data)
-        recv_data = tcp_socket.recv(1024)
-        tcp_socket.close()
+        logger.debug('登录服务器: %s:%d', *server_addr)
+        with socket.create_connection(server_addr, timeout = CONNECT_TIMEOUT) as tcp_socket:
+            tcp_socket.settimeout(READ_TIMEOUT)
+            tcp_socket.send(send_data)
+            recv_data = tcp_socket.recv(1024)
         return recv_data # 返回封包体
 
     @staticmethod
@@ -53,14 +115,22 @@ class Login():
     def login_verify(self, userid, double_md5_password, verification_code_num = b'\x00' * 16, verification_code = b'\x00' * 4):
         packet = b'\x00\x00\x00\x931\x00\x00\x00g\t\xc0\xb6\xf7\x00\x00\x00\x00b47906b7958676b2b686a6ec61b1016c\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\xe3^\xbf{\x1dd\xc3\xca\xb6/D/;HI\xd9AAAA\x00\x00unknown\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
         packet = packet[:9] + struct.pack('>I', userid) + packet[13:17] + double_md5_password.encode() + packet[49:61] + verification_code_num + verification_code + packet[81:]
-        recv_data = self.send_login_packet(self.get_server_addr(), packet)
+        with self.phase('gateway'):
+            server_addr = self.get_server_addr()
+        with self.phase('verify'):
+            try:
+                recv_data = self.send_login_packet(server_addr, packet)
+            except OSError:
+                # 缓存的地址可能已失效，重新获取地址后再试一次
+                invalidate_server_addr()
+                recv_data = self.send_login_packet(self.get_server_addr(), packet)
         recv_packet_body = recv_data[17:]
         if recv_packet_body[3] == 0:
-            print('登录成功')
+            logger.info('登录成功: %d', userid)
         elif recv_packet_body[3] == 1:
-            print('密码错误')
+            logger.warning('密码错误: %d', userid)
         elif recv_packet_body[3] == 2:
-            print('验证码错误')
+            logger.warning('验证码错误: %d', userid)
             with open(r'验证码.bmp', 'wb')as f:
                 f.write(recv_packet_body[24:])
             _verification_code_num = recv_packet_body[4:4+16]
@@ -0,0 +1,112 @@
+import threading, time
+from collections import deque
+
+
+class MessageBatcher:
+    """把工作线程（接收线程、日常任务线程）产生的消息攒成批，再整批交给界面线程
+
+    put 只把消息放入有上限的队列；后台线程每隔 interval 秒、或攒够 batch_size 条时调用一次
+    deliver(消息列表)（如 Qt 信号的 emit）。界面处理完一批后调用 acknowledge，未确认的批次达到
+    max_in_flight 时暂停投递，期间的消息继续在队列中累积，超出 capacity 时丢弃最旧的消息。
+    """
+
+    def __init__(self, deliver, interval=0.1, batch_size=200, capacity=10000, max_in_flight=2, name='message-batcher'):
+        self.deliver = deliver
+        self.interval = interval
+        self.batch_size = batch_size
+        self.capacity = capacity
+        self.max_in_flight = max_in_flight
+        self.name = name
+        self.condition = threading.Condition()
+        self.queue = deque()
+        self.in_flight = 0
+        self.running = False
+        self.thread = None
+        # 统计
+        self.received = 0  # put 收到的消息数
+        self.delivered = 0  # 已投递的消息数
+        self.batches = 0  # 投递的批次数
+        self.dropped = 0  # 界面处理不过来时丢弃的消息数
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return self
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, flush=True):
+        """停止后台线程，flush 为 True 时先投递队列中剩余的消息"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+        if flush:
+            batch = self._take()
+            if batch:
+                self._deliver(batch)
+
+    def put(self, message):
+        """添加一条消息，可在任意线程调用，不会阻塞"""
+        with self.condition:
+            self.received += 1
+            if len(self.queue) >= self.capacity:
+                self.queue.popleft()
+                self.dropped += 1
+            self.queue.append(message)
+            if len(self.queue) >= self.batch_size:
+                self.condition.notify()
+
+    __call__ = put  # 可以直接作为 message_callback 使用
+
+    def acknowledge(self):
+        """界面处理完一批消息后调用，允许投递下一批"""
+        with self.condition:
+            if self.in_flight > 0:
+                self.in_flight -= 1
+            self.condition.notify()
+
+    def stats(self):
+        """返回统计：收到、投递、丢弃的消息数，批次数，平均每批合并的消息数，当前排队数"""
+        return {
+            'received': self.received,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'coalesced': self.delivered - self.batches,
+            'average_batch': self.delivered / self.batches if self.batches else 0,
+            'queued': len(self.queue),
+        }
+
+    def _take(self):
+        with self.condition:
+            batch = list(self.queue)
+            self.queue.clear()
+            return batch
+
+    def _deliver(self, batch):
+        self.batches += 1
+        self.delivered += len(batch)
+        self.deliver(batch)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                deadline = time.monotonic() + self.interval
+                # 等到攒够一批或到达刷新间隔，且界面没有积压太多未处理的批次
+                while self.running:
+                    remaining = deadline - time.monotonic()
+                    ready = self.queue and (remaining <= 0 or len(self.queue) >= self.batch_size)
+                    if ready and self.in_flight < self.max_in_flight:
+                        break
+                    self.condition.wait(remaining if remaining > 0 and not ready else self.interval)
+                if not self.running:
+                    return
+                batch = list(self.queue)
+                self.queue.clear()
+                self.in_flight += 1
+            self._deliver(batch)
@@ -0,0 +1,139 @@
+import asyncio, threading, time
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+
+# 发送后需要等待的确认命令：发送的命令号 -> 任一到达即视为服务器已处理的命令号
+ACK_COMMANDS = {
+    2404: (2504,),  # READY_TO_FIGHT -> NOTE_START_FIGHT
+    2405: (2505, 2506),  # USE_SKILL -> NOTE_USE_SKILL（技能结果）/ FIGHT_OVER
+    2410: (2506,),  # ESCAPE_FIGHT -> FIGHT_OVER
+    2415: (2503,),  # START_FIGHT_LEVEL -> NOTE_READY_TO_FIGHT
+}
+# 只在战斗中才会有确认的命令，战斗结束后不再等待
+FIGHT_COMMANDS = {2405, 2410}
+NOTE_START_FIGHT = 2504
+FIGHT_OVER = 2506
+
+
+class PaceToken:
+    """一次发送的节奏记录，在发送前由 PacingEngine.before_send 创建"""
+    __slots__ = ('command_id', 'sent_at', 'ack')
+
+    def __init__(self, command_id, sent_at, ack=None):
+        self.command_id = command_id
+        self.sent_at = sent_at
+        self.ack = ack  # 等待确认命令的 Future，没有确认命令时为 None
+
+
+class PacingEngine:
+    """根据服务器响应控制发包节奏，代替每个封包后固定的 time.sleep(0.3)
+
+    有确认命令的封包等到确认到达（或超时）即继续；没有确认命令的封包按该命令
+    观察到的响应延迟（服务器回显同一命令号的时间）决定最小间隔，尚无观察数据时使用流程给出的等待时间。
+    """
+
+    def __init__(self, dispatcher, ack_timeout=3.0, min_interval=0.05, latency_factor=1.5, smoothing=0.2):
+        self.ack_timeout = ack_timeout  # 等待确认命令的超时时间（秒）
+        self.min_interval = min_interval  # 任意两个封包之间的最小间隔（秒）
+        self.latency_factor = latency_factor  # 学习到的间隔 = 平均响应延迟 * latency_factor
+        self.smoothing = smoothing  # 平均响应延迟的指数平滑系数
+        self.latency = {}  # 命令号 -> 平均响应延迟（秒）
+        self.in_fight = None  # 是否在战斗中，未知时为 None
+        self.lock = threading.Lock()
+        self._ack_waiters = []  # [(确认命令号集合, 发送时间, Future), ...]
+        self._unanswered = {}  # 命令号 -> deque[发送时间]，用于测量响应延迟
+        dispatcher.add_listener(self.on_packet)
+
+    def before_send(self, command_id):
+        """在发送封包之前调用，返回用于之后 wait 的 PaceToken"""
+        now = time.monotonic()
+        ack = None
+        ack_commands = ACK_COMMANDS.get(command_id)
+        if ack_commands and not (command_id in FIGHT_COMMANDS and self.in_fight is False):
+            ack = Future()
+        with self.lock:
+            # 发送后没有等待（后面没有 Sleep）且一直没有确认的记录不再保留
+            if self._ack_waiters and now - self._ack_waiters[0][1] > self.ack_timeout:
+                self._ack_waiters = [waiter for waiter in self._ack_waiters if now - waiter[1] <= self.ack_timeout]
+            if ack is not None:
+                self._ack_waiters.append((ack_commands, now, ack))
+            self._unanswered.setdefault(command_id, deque(maxlen = 16)).append(now)
+        return PaceToken(command_id, now, ack)
+
+    def completed(self):
+        """已经收到响应（如 Request 步骤）时使用的节奏记录，只需保证最小间隔"""
+        return PaceToken(None, time.monotonic())
+
+    def interval(self, token, default):
+        """没有确认命令时，距离发送需要间隔的时间"""
+        if token.command_id is None:
+            return self.min_interval
+        latency = self.latency.get(token.command_id)
+        if latency is None:
+            return default
+        return min(default, max(self.min_interval, latency * self.latency_factor))
+
+    def wait(self, token, default):
+        """阻塞到可以发送下一个封包，default 为流程原本的等待时间"""
+        if token is None:
+            time.sleep(default)
+            return
+        if token.ack is not None:
+            try:
+                token.ack.result(self.ack_timeout)
+            except TimeoutError:
+                self._drop_ack(token.ack)
+            delay = token.sent_at + self.min_interval - time.monotonic()
+        else:
+            delay = token.sent_at + self.interval(token, default) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, token, default):
+        """wait 的协程版本"""
+        if token is None:
+            await asyncio.sleep(default)
+            return
+        if token.ack is not None:
+            try:
+                await asyncio.wait_for(asyncio.wrap_future(token.ack), self.ack_timeout)
+            except asyncio.TimeoutError:
+                self._drop_ack(token.ack)
+            delay = token.sent_at + self.min_interval - time.monotonic()
+        else:
+            delay = token.sent_at + self.interval(token, default) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_packet(self, command_id, packet_data):
+        """ResponseDispatcher 的监听器：记录响应延迟、战斗状态并完成确认"""
+        now = time.monotonic()
+        completed = []
+        with self.lock:
+            if command_id == NOTE_START_FIGHT:
+                self.in_fight = True
+            elif command_id == FIGHT_OVER:
+                self.in_fight = False
+            unanswered = self._unanswered.get(command_id)
+            # 超过确认超时仍未回显的发送记录视为没有回显，不参与延迟统计
+            while unanswered and now - unanswered[0] > self.ack_timeout:
+                unanswered.popleft()
+            if unanswered:
+                latency = now - unanswered.popleft()
+                previous = self.latency.get(command_id)
+                self.latency[command_id] = latency if previous is None else previous + self.smoothing * (latency - previous)
+            if self._ack_waiters:
+                remaining = []
+                for waiter in self._ack_waiters:
+                    if command_id in waiter[0]:
+                        completed.append(waiter[2])
+                    else:
+                        remaining.append(waiter)
+                self._ack_waiters = remaining
+        for future in completed:
+            if future.set_running_or_notify_cancel():
+                future.set_result(command_id)
+
+    def _drop_ack(self, future):
+        with self.lock:
+            self._ack_waiters = [waiter for waiter in self._ack_waiters if waiter[2] is not future]
@@ -0,0 +1,153 @@
+import struct, sys, time
+
+_LENGTH = struct.Struct('>I')  # 封包头部的4字节长度
+
+
+class PacketFramer:
+    """基于预分配缓冲区的封包分帧器
+
+    数据通过 recv_into 直接写入缓冲区，完整的封包以 memoryview 的形式交给上层，
+    不产生中间 bytes 对象。封包必须在内存中连续，因此缓冲区写满时不回绕，
+    而是把尚未处理完的半个封包搬到缓冲区开头（单个封包超过容量时才扩容）。
+    """
+
+    def __init__(self, read_size=4096, capacity=65536):
+        self.read_size = read_size
+        self.buffer = bytearray(max(capacity, read_size))
+        self.view = memoryview(self.buffer)
+        self.start = 0  # 未处理数据的起点
+        self.end = 0  # 已写入数据的终点
+
+    def pending(self):
+        """缓冲区中尚未分帧的字节数"""
+        return self.end - self.start
+
+    def fill(self, tcp_socket):
+        """从 socket 读取一次数据，返回读取的字节数，0 表示连接已断开"""
+        received = tcp_socket.recv_into(self.get_buffer(), self.read_size)
+        self.commit(received)
+        return received
+
+    def get_buffer(self):
+        """返回可直接写入的空闲区域（长度为 read_size），写入后调用 commit"""
+        self._reserve(self.read_size)
+        return self.view[self.end:self.end + self.read_size]
+
+    def commit(self, size):
+        """确认 get_buffer 返回的区域中已写入 size 字节"""
+        self.end += size
+
+    def feed(self, data):
+        """直接写入一段数据（用于回放抓包）"""
+        self._reserve(len(data))
+        self.view[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def frames(self):
+        """依次返回缓冲区中所有完整的封包，返回的 memoryview 只在下一次 fill/feed 之前有效"""
+        buffer, view = self.buffer, self.view
+        start, end = self.start, self.end
+        while end - start >= 4:  # 至少要有4个字节来提取封包长度
+            packet_length = _LENGTH.unpack_from(buffer, start)[0]
+            if packet_length < 5:
+                raise ValueError(f"封包长度异常: {packet_length}")
+            if end - start < packet_length:
+                break
+            self.start = start + packet_length
+            yield view[start:self.start]
+            start = self.start
+        if self.start == self.end:
+            self.start = self.end = 0
+
+    def _reserve(self, size):
+        """保证缓冲区末尾至少有 size 字节的空闲空间"""
+        if len(self.buffer) - self.end >= size:
+            return
+        pending = self.end - self.start
+        if pending + size <= len(self.buffer):
+            # memoryview 之间的赋值可以处理重叠区域
+            self.view[:pending] = self.view[self.start:self.end]
+        else:
+            buffer = bytearray(max(len(self.buffer) * 2, pending + size))
+            buffer[:pending] = self.view[self.start:self.end]
+            self.buffer = buffer
+            self.view = memoryview(buffer)
+        self.start = 0
+        self.end = pending
+
+
+class ReplaySocket:
+    """按固定块大小回放一段字节流的伪 socket"""
+
+    def __init__(self, data, chunk_size=1024):
+        self.data = memoryview(data)
+        self.chunk_size = chunk_size
+        self.offset = 0
+
+    def recv(self, size):
+        size = min(size, self.chunk_size)
+        chunk = bytes(self.data[self.offset:self.offset + size])
+        self.offset += len(chunk)
+        return chunk
+
+    def recv_into(self, buffer, size=0):
+        size = min(size or len(buffer), self.chunk_size)
+        chunk = self.data[self.offset:self.offset + size]
+        buffer[:len(chunk)] = chunk
+        self.offset += len(chunk)
+        return len(chunk)
+
+
+def _legacy_frames(tcp_socket):
+    """原 receive_data 的分帧方式：bytes 拼接 + 切片"""
+    count = 0
+    buffer = b''
+    while True:
+        recv_data = tcp_socket.recv(1024)
+        if not recv_data:
+            return count
+        buffer += recv_data
+        while len(buffer) >= 4:
+            packet_length = int.from_bytes(buffer[:4], byteorder = 'big')
+            if len(buffer) < packet_length:
+                break
+            packet_data = buffer[:packet_length]
+            buffer = buffer[packet_length:]
+            count += 1
+
+
+def _framer_frames(tcp_socket, read_size):
+    count = 0
+    framer = PacketFramer(read_size = read_size)
+    while framer.fill(tcp_socket):
+        for frame in framer.frames():
+            count += 1
+    return count
+
+
+def _synthetic_burst():
+    """模拟一次登录后的推送：背包数据（50只精灵）、仓库数据以及大量小封包"""
+    frames = []
+    for body_length in (4 + 390 * 50, 8 * 3000):
+        frames.append((body_length + 17).to_bytes(4, byteorder = 'big') + bytes(body_length + 13))
+    for i in range(5000):
+        body_length = (i * 7) % 64
+        frames.append((body_length + 17).to_bytes(4, byteorder = 'big') + bytes(body_length + 13))
+    return b''.join(frames)
+
+
+if __name__ == '__main__':
+    # 用法：python -m core.PacketFramer [抓包文件] [read_size]
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            data = f.read()
+    else:
+        data = _synthetic_burst()
+    read_size = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+
+    for name, run in (('before', lambda: _legacy_frames(ReplaySocket(data, read_size))),
+                      ('after', lambda: _framer_frames(ReplaySocket(data, read_size), read_size))):
+        begin = time.perf_counter()
+        count = run()
+        elapsed = time.perf_counter() - begin
+        print(f"{name}: {count} frames, {len(data)} bytes, {count / elapsed:.0f} frames/sec")
@@ -0,0 +1,73 @@
+import functools
+from function.CommandTable import get_command_table
+
+
+class PacketTemplate:
+    """预先解析的封包模板
+
+    十六进制字符串只在编译时解析一次，得到封包头（长度、版本、命令号）和封包体。
+    slots 描述封包体中需要在发送时填入的字段：名称 -> (偏移, 字节数)，例如精灵的捕获时间戳、关卡编号。
+    """
+    __slots__ = ('header', 'command_id', 'body', 'slots')
+
+    def __init__(self, packet, **slots):
+        packet_bytes = bytes.fromhex(packet) if isinstance(packet, str) else bytes(packet)
+        if len(packet_bytes) < 17:
+            raise ValueError(f"封包长度不足17字节: {len(packet_bytes)}")
+        self.header = packet_bytes[:9]  # 长度 + 版本 + 命令号，米米号和序列号在发送时填入
+        self.command_id = int.from_bytes(packet_bytes[5:9], byteorder = 'big')
+        self.body = packet_bytes[17:]
+        for name, (offset, size) in slots.items():
+            if offset < 0 or offset + size > len(self.body):
+                raise ValueError(f"字段 {name} 超出封包体范围")
+        self.slots = slots
+
+    @classmethod
+    def from_command(cls, command, body=b'', **slots):
+        """按命令名称（或命令号）和封包体构造模板，封包头的长度和版本自动填写"""
+        command_id = get_command_table().id(command) if isinstance(command, str) else command
+        body = bytes.fromhex(body) if isinstance(body, str) else bytes(body)
+        header = (17 + len(body)).to_bytes(4, byteorder = 'big') + b'\x31' + command_id.to_bytes(4, byteorder = 'big')
+        return cls(header + bytes(8) + body, **slots)
+
+    def bind(self, **values):
+        """填入字段，返回可直接发送的封包；int 按大端写入，str 按十六进制解析"""
+        if not values:
+            return self
+        body = bytearray(self.body)
+        for name, value in values.items():
+            offset, size = self.slots[name]
+            if isinstance(value, int):
+                value = value.to_bytes(size, byteorder = 'big')
+            elif isinstance(value, str):
+                value = bytes.fromhex(value)
+            if len(value) != size:
+                raise ValueError(f"字段 {name} 需要 {size} 字节")
+            body[offset:offset + size] = value
+        return BoundPacket(self, bytes(body))
+
+    def __repr__(self):
+        return f"PacketTemplate({self.command_id}, {self.body.hex(' ').upper()})"
+
+
+class BoundPacket:
+    """填好字段的封包模板"""
+    __slots__ = ('header', 'command_id', 'body')
+
+    def __init__(self, template, body):
+        self.header = template.header
+        self.command_id = template.command_id
+        self.body = body
+
+
+@functools.lru_cache(maxsize = 1024)
+def compile_packet(packet: str) -> PacketTemplate:
+    """编译十六进制字符串封包，相同的字符串只解析一次"""
+    return PacketTemplate(packet)
+
+
+def as_packet(packet):
+    """把十六进制字符串、PacketTemplate 或 BoundPacket 统一为可发送的封包"""
+    if isinstance(packet, str):
+        return compile_packet(packet)
+    return packet
@@ -1,74 +1,244 @@
-import time
+import functools, time
+from collections import namedtuple
+from .PacingEngine import PacingEngine
+from .PacketTemplate import PacketTemplate, as_packet
+from .PetParser import index_warehouse, iter_bag, warehouse_count
+from .TeamManager import team_diff, team_preset
+
+# 日常流程以生成器描述，每一步 yield 一个动作，由同步或异步的执行器完成
+Send = namedtuple('Send', 'packet')  # 发送封包
+Sleep = namedtuple('Sleep', 'seconds')  # 等待一段时间
+Request = namedtuple('Request', 'packet command_id timeout')  # 发送封包并等待响应，yield 的结果为响应封包（超时为 None）
+
+# 带有可变字段的封包模板，字段偏移相对于封包体
+# 背包与仓库之间存取精灵：捕获时间戳 + 存取方向（0 放入仓库，1 放入背包）
+MOVE_PET = PacketTemplate('00 00 00 19 31 00 00 09 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00',
+                          catch_time = (0, 4), in_bag = (4, 4))
+# 战斗中切换精灵：捕获时间戳
+CHANGE_PET = PacketTemplate('00 00 00 15 31 00 00 09 67 00 00 00 00 00 00 00 00 00 00 00 00', catch_time = (0, 4))
+# 获取仓库精灵列表：起始序号 + 结束序号（包含）
+WAREHOUSE_LIST = PacketTemplate('00 00 00 19 31 00 00 B1 E7 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00',
+                                start = (0, 4), end = (4, 4))
+WAREHOUSE_CAPACITY = 1000  # 仓库列表的序号范围为 0 ~ 999
+# 挑战关卡：地图编号 + 模式 + 关卡编号
+CHALLENGE_LEVEL = PacketTemplate('00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00',
+                                 map_id = (0, 4), mode = (4, 4), level = (8, 4))
+
+
+def packet_command_id(packet):
+    """取出封包（十六进制字符串或封包模板）的命令号"""
+    return as_packet(packet).command_id
+
+
+def routine(func):
+    """把以 yield 描述收发步骤的生成器方法包装为普通方法，由 run_steps 执行，原生成器函数保存在 steps 属性上"""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self.run_steps(func(self, *args, **kwargs))
+    wrapper.steps = func
+    return wrapper
+
 
 class PetFightPacketManager:
-    def __init__(self, send_packet_processing, receive_packet_analysis, message_callback=None):
+    def __init__(self, send_packet_processing, receive_packet_analysis, message_callback=None, pacing=True, warehouse_page_size=200,
+                 timestamp_cache=None):
         self.send_packet_processing = send_packet_processing
         self.receive_packet_analysis = receive_packet_analysis
         self.message_callback = message_callback
-        # 存储精灵ID和对应时间戳的字典
-        self.pet_timestamps = {}
-
-    def check_backpack_pets(self, pet_ids):
-        """检查背包里是否有指定的宠物"""
-        self.send_packet_processing.SendPacket('00 00 00 11 31 00 00 AA BA 00 00 00 00 00 00 00 00')
-        packet_data = self.receive_packet_analysis.wait_for_specific_data(43706, timeout = 3)
-        # Step 1: 取出封包头 (前17字节)
-        packet_body = packet_data[17:]
-        # Step 2: 判断背包是否为空
-        if packet_body == b'\x00\x00\x00\x00\x00\x00\x00\x00':
+        # 根据服务器响应控制发包节奏，关闭时按流程中固定的等待时间发包
+        self.pacer = PacingEngine(receive_packet_analysis.dispatcher) if pacing else None
+        # 分页获取仓库列表时每页的精灵数，0 表示一次获取整个仓库
+        self.warehouse_page_size = warehouse_page_size
+        # 最近一次解析的背包精灵（PetRecord）
+        self.bag_pets = ()
+        # 存储精灵ID和对应时间戳的字典，有磁盘缓存（PetTimestampCache）时从缓存开始
+        self.timestamp_cache = timestamp_cache
+        self.pet_timestamps = timestamp_cache.snapshot() if timestamp_cache else {}
+
+    def steps(self, name, *args, **kwargs):
+        """返回指定流程的步骤生成器，用于在一个流程中嵌套调用另一个流程"""
+        return getattr(type(self), name).steps(self, *args, **kwargs)
+
+    def run_steps(self, steps):
+        """在当前线程中依次执行流程的各个步骤，返回流程的返回值
+
+        启用节奏控制时，Sleep 步骤等待的是上一个封包的确认（或学习到的间隔），而不是固定时间。
+        """
+        value = None
+        token = None  # 上一次发送的节奏记录
+        while True:
+            try:
+                step = steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+            value = None
+            if isinstance(step, Send):
+                packet = as_packet(step.packet)
+                if self.pacer:
+                    token = self.pacer.before_send(packet.command_id)
+                self.send_packet_processing.SendPacket(packet)
+            elif isinstance(step, Sleep):
+                if self.pacer:
+                    self.pacer.wait(token, step.seconds)
+                else:
+                    time.sleep(step.seconds)
+            elif isinstance(step, Request):
+                value = self.request(step.packet, step.command_id, step.timeout)
+                if self.pacer:
+                    token = self.pacer.completed()
+            else:
+                raise TypeError(f"Unknown step: {step!r}")
+
+    def request(self, packet, command_id, timeout = 3, predicate = None):
+        """发送封包并等待指定命令号的响应，先登记等待再发送，响应不会早于等待而丢失"""
+        future = self.receive_packet_analysis.expect(command_id, predicate)
+        self.send_packet_processing.SendPacket(packet)
+        return self.receive_packet_analysis.wait_for_specific_data(command_id, timeout, future = future)
+
+    @routine
+    def read_bag(self):
+        """获取并解析背包列表，返回背包中的精灵（PetRecord），超时返回 None"""
+        packet_data = yield Request('00 00 00 11 31 00 00 AA BA 00 00 00 00 00 00 00 00', 43706, 3)
+        if packet_data is None:
             if self.message_callback:
-                self.message_callback("背包|检查|背包为空，调用仓库存取")
-            self.check_warehouse_pets(pet_ids)  # 调用仓库存取函数
-            return
-        # Step 3: 提取宠物数量 (前4字节) 并转换为整数
-        pet_count = int.from_bytes(packet_body[:4], byteorder = 'big')
-        if self.message_callback:
-            self.message_callback(f"背包|检查|宠物数量: {pet_count}")
-        # Step 4: 解析宠物信息，每只宠物占用390个字节
-        pet_data_start = 4  # 宠物数据从第5个字节开始
-        pet_data_length = 390  # 每只宠物信息占用390字节
-        for i in range(pet_count):
-            pet_data = packet_body[pet_data_start:pet_data_start + pet_data_length]
-            pet_id = int.from_bytes(pet_data[:4], byteorder = 'big')  # 宠物ID在宠物数据的前4个字节
-            # 提取时间戳 (假设时间戳在148-152字节处，4字节)
-            timestamp_bytes = pet_data[148:152]
-            timestamp = int.from_bytes(timestamp_bytes, byteorder = 'big')
-
+                self.message_callback("背包|错误|获取背包列表超时")
+            return None
+        # 按每只390字节解析背包中的精灵（跳过17字节的封包头），解析结果保存供之后的流程复用
+        self.bag_pets = tuple(iter_bag(packet_data[17:]))
+        for pet in self.bag_pets:
             # 保存精灵时间戳到字典中
-            self.pet_timestamps[pet_id] = timestamp_bytes.hex().upper()
+            self.pet_timestamps[pet.pet_id] = pet.catch_time_bytes.hex().upper()
+        return self.bag_pets
 
+    @routine
+    def check_backpack_pets(self, pet_ids):
+        """检查背包里是否有指定的宠物，只移动与需要的精灵不一致的部分，返回精灵是否都已放入背包"""
+        # Step 1: 解析背包中的精灵
+        if (yield from self.steps('read_bag')) is None:
+            return False
+        if self.message_callback:
+            self.message_callback(f"背包|检查|宠物数量: {len(self.bag_pets)}")
+        # Step 2: 计算背包与需要的精灵（包括顺序）的差异
+        to_warehouse, to_bag = team_diff(self.bag_pets, tuple(pet_ids))
+        if not to_warehouse and not to_bag:
             if self.message_callback:
-                self.message_callback(f"背包|精灵|ID:{pet_id} 时间戳:{timestamp} 十六进制:{timestamp_bytes.hex().upper()}")
-            self.send_packet_processing.SendPacket('00 00 00 19 31 00 00 09 00 00 00 00 00 00 00 00 00' + timestamp_bytes.hex().upper() + '00 00 00 00')
-            pet_data_start += pet_data_length
-        self.check_warehouse_pets(pet_ids)  # 调用仓库存取函数
-
+                self.message_callback("背包|检查|精灵已就位，跳过仓库存取")
+            self.save_pet_timestamps()
+            return True
+        # Step 3: 只把多余或顺序不对的精灵放入仓库
+        for pet in to_warehouse:
+            timestamp_bytes = pet.catch_time_bytes
+            if self.message_callback:
+                self.message_callback(f"背包|精灵|ID:{pet.pet_id} 时间戳:{pet.catch_time} 十六进制:{timestamp_bytes.hex().upper()}")
+            yield Send(MOVE_PET.bind(catch_time = timestamp_bytes, in_bag = 0))
+        # Step 4: 从仓库放入缺少的精灵
+        if to_bag:
+            missing = yield from self.steps('check_warehouse_pets', to_bag)  # 调用仓库存取函数
+            return not missing
+        self.save_pet_timestamps()
+        return True
+
+    @routine
+    def prepare_team(self, team):
+        """把背包调整为指定的出战精灵，team 为 TEAM_PRESETS 中的预设名称或精灵ID序列，返回是否成功"""
+        return (yield from self.steps('check_backpack_pets', team_preset(team)))
+
+    @routine
     def check_warehouse_pets(self, pet_ids):
-        """检查仓库里是否有指定的宠物，并返回对应的时间戳列表"""
-        self.send_packet_processing.SendPacket('00 00 00 19 31 00 00 B1 E7 00 00 00 00 00 00 00 00 00 00 00 00 00 00 03 E7')
-        packet_data = self.receive_packet_analysis.wait_for_specific_data(45543, timeout = 3)
+        """把指定的精灵从仓库放入背包，返回仓库中找不到的精灵ID列表
+
+        时间戳已知的精灵（背包中解析到的或磁盘缓存）直接放入，只为其余的精灵获取仓库列表。
+        用已知时间戳放入的精灵在重新获取的背包中找不到时（已放生、交易或时间戳过期），
+        丢弃它的时间戳，改从仓库列表查找后重新放入。
+        """
+        unknown = [pet_id for pet_id in pet_ids if pet_id not in self.pet_timestamps]
+        missing = yield from self.steps('lookup_warehouse', unknown)
+        # 按 pet_ids 的顺序放入背包，保持出战顺序
         for pet_id in pet_ids:
-            pet_id_hex = pet_id.to_bytes(4, byteorder = 'big').hex()
-            pet_found = False
-            # 从切片后的数据中找到与精灵ID匹配的时间戳
-            for i in range(len(packet_data) - 8):
-                current_id = packet_data[i:i+4]
-                if current_id == bytes.fromhex(pet_id_hex):
-                    pet_found = True
-                    # 时间戳位于精灵ID的后四个字节
-                    timestamp = packet_data[i+4:i+8]
-
-                    # 保存精灵时间戳到字典中
-                    self.pet_timestamps[pet_id] = timestamp.hex().upper()
-
-                    if self.message_callback:
-                        self.message_callback(f"仓库|精灵|ID:{pet_id} 时间戳:{int.from_bytes(timestamp, byteorder = 'big')} 十六进制:{timestamp.hex().upper()}")
-                    self.send_packet_processing.SendPacket('00 00 00 19 31 00 00 09 00 00 00 00 00 00 00 00 00' + timestamp.hex().upper() + '00 00 00 01')
-                    break
-            if not pet_found:
+            if pet_id in missing:
+                continue
+            if pet_id not in unknown and self.message_callback:
+                self.message_callback(f"仓库|缓存|ID:{pet_id} 十六进制:{self.pet_timestamps[pet_id]}")
+            yield Send(MOVE_PET.bind(catch_time = self.pet_timestamps[pet_id], in_bag = 1))
+        known = [pet_id for pet_id in pet_ids if pet_id not in unknown]
+        if known:
+            # 检查用已知时间戳放入的精灵是否都已到背包
+            bag = yield from self.steps('read_bag')
+            in_bag = {pet.pet_id for pet in bag} if bag is not None else set(known)
+            stale = [pet_id for pet_id in known if pet_id not in in_bag]
+            if stale:
                 if self.message_callback:
-                    self.message_callback(f"仓库|错误|精灵 {pet_id} 未找到")
-                return None
+                    self.message_callback(f"仓库|缓存|精灵 {', '.join(map(str, stale))} 的时间戳已失效，重新查找")
+                for pet_id in stale:
+                    self.discard_pet_timestamp(pet_id)
+                missing += yield from self.steps('lookup_warehouse', stale)
+                # 失效精灵之后放入的精灵先放回仓库，再按顺序重新放入，保持出战顺序
+                redo = [pet_id for pet_id in pet_ids[pet_ids.index(stale[0]):] if pet_id not in missing]
+                for pet_id in redo:
+                    if pet_id in in_bag:
+                        yield Send(MOVE_PET.bind(catch_time = self.pet_timestamps[pet_id], in_bag = 0))
+                for pet_id in redo:
+                    yield Send(MOVE_PET.bind(catch_time = self.pet_timestamps[pet_id], in_bag = 1))
+        self.save_pet_timestamps()
+        return missing
+
+    @routine
+    def lookup_warehouse(self, pet_ids):
+        """从仓库列表中查找精灵的时间戳并记录，返回找不到的精灵ID列表"""
+        if not pet_ids:
+            return []
+        warehouse = yield from self.steps('fetch_warehouse', pet_ids)
+        for pet_id, timestamps in (warehouse or {}).items():
+            timestamp = timestamps[0].to_bytes(4, byteorder = 'big')
+            # 保存精灵时间戳到字典中
+            self.pet_timestamps[pet_id] = timestamp.hex().upper()
+            if self.message_callback:
+                self.message_callback(f"仓库|精灵|ID:{pet_id} 时间戳:{timestamps[0]} 十六进制:{timestamp.hex().upper()}")
+        missing = [pet_id for pet_id in pet_ids if pet_id not in self.pet_timestamps]
+        if missing and self.message_callback:
+            self.message_callback(f"仓库|错误|精灵 {', '.join(map(str, missing))} 未找到")
+        return missing
+
+    @routine
+    def fetch_warehouse(self, pet_ids):
+        """分页获取仓库列表，每页到达后立即解析，所有 pet_ids 都找到或仓库已取完时停止
+
+        返回 {精灵ID: [时间戳, ...]} 索引，第一页就超时时返回 None。
+        """
+        page_size = self.warehouse_page_size or WAREHOUSE_CAPACITY
+        warehouse = {}
+        missing = set(pet_ids)
+        for start in range(0, WAREHOUSE_CAPACITY, page_size):
+            end = min(start + page_size, WAREHOUSE_CAPACITY) - 1
+            packet_data = yield Request(WAREHOUSE_LIST.bind(start = start, end = end), 45543, 3)
+            if packet_data is None:
+                if self.message_callback:
+                    self.message_callback("仓库|错误|获取仓库列表超时")
+                return warehouse if start else None
+            body = packet_data[17:]
+            for pet_id, timestamps in index_warehouse(body, missing).items():
+                warehouse.setdefault(pet_id, []).extend(timestamps)
+            missing.difference_update(warehouse)
+            # 不足一页说明仓库已经取完
+            if not missing or warehouse_count(body) < end - start + 1:
+                break
+        return warehouse
+
+    def save_pet_timestamps(self):
+        """把已知的精灵时间戳写入磁盘缓存"""
+        if self.timestamp_cache:
+            self.timestamp_cache.update(self.pet_timestamps)
+            try:
+                self.timestamp_cache.save()
+            except OSError as e:
+                if self.message_callback:
+                    self.message_callback(f"缓存|错误|保存精灵时间戳失败: {str(e)}")
+
+    def discard_pet_timestamp(self, pet_id):
+        """丢弃失效的精灵时间戳，包括磁盘缓存中的"""
+        self.pet_timestamps.pop(pet_id, None)
+        if self.timestamp_cache:
+            self.timestamp_cache.discard(pet_id)
 
     def get_pet_timestamp(self, pet_id, default_timestamp="00000000"):
         """获取精灵的时间戳，如果没有找到则返回默认值"""
@@ -82,6 +252,7 @@ class PetFightPacketManager:
         """获取所有已保存的精灵时间戳"""
         return self.pet_timestamps.copy()
 
+    @routine
     def daily_props_collection(self):
         data =  (
             # 星愿漂流瓶签到
@@ -121,17 +292,19 @@ class PetFightPacketManager:
         )
 
         for i in data:
-            self.send_packet_processing.SendPacket(i)
-            time.sleep(0.3)
+            yield Send(i)
+            yield Sleep(0.3)
 
+    @routine
     def engraved_raffle_machine(self):
         data = (
             # 刻印抽奖机
             '00 00 00 19 31 00 00 B4 DD 00 00 00 00 00 00 00 00 00 00 00 01 00 00 00 00',
         )
 
-        self.send_packet_processing.SendPacket(data[0])
+        yield Send(data[0])
 
+    @routine
     def vip_package(self):
         data = (
             # VIP相关
@@ -144,9 +317,10 @@ class PetFightPacketManager:
         )
 
         for i in data:
-            self.send_packet_processing.SendPacket(i)
-            time.sleep(0.3)
+            yield Send(i)
+            yield Sleep(0.3)
 
+    @routine
     def team_contribution(self):
         data = (
             # 战队贡献
@@ -158,9 +332,10 @@ class PetFightPacketManager:
         )
 
         for i in data:
-            self.send_packet_processing.SendPacket(i)
-            time.sleep(0.3)
+            yield Send(i)
+            yield Sleep(0.3)
 
+    @routine
     def make_a_wish(self):
         data = (
             # 星愿漂流瓶许愿培养道具
@@ -168,52 +343,42 @@ class PetFightPacketManager:
         )
 
         for i in range(10):
-            self.send_packet_processing.SendPacket(data[0])
-            time.sleep(0.3)
+            yield Send(data[0])
+            yield Sleep(0.3)
 
+    @routine
     def experience_training_ground(self):
-        data =  (
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 67 00 00 00 06 00 00 00 01',
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 67 00 00 00 06 00 00 00 02',
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 67 00 00 00 06 00 00 00 03',
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 67 00 00 00 06 00 00 00 04',
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 67 00 00 00 06 00 00 00 05',
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 67 00 00 00 06 00 00 00 06'
-        )
+        data = tuple(CHALLENGE_LEVEL.bind(map_id = 0x67, mode = 6, level = level) for level in range(1, 7))
 
         c = 0
         while c < 6:
             for i in data:
-                self.send_packet_processing.SendPacket(i)
-                time.sleep(0.3)
+                yield Send(i)
+                yield Sleep(0.3)
                 for j in self.fight_84_packets():
-                    self.send_packet_processing.SendPacket(j)
-                    time.sleep(0.3)
+                    yield Send(j)
+                    yield Sleep(0.3)
             c += 1
-        time.sleep(0.3)
-        self.send_packet_processing.SendPacket('00 00 00 21 31 00 00 A5 9B 00 00 00 00 00 00 00 00 00 00 00 67 00 00 00 03 00 00 00 00 00 00 00 00')
+        yield Sleep(0.3)
+        yield Send('00 00 00 21 31 00 00 A5 9B 00 00 00 00 00 00 00 00 00 00 00 67 00 00 00 03 00 00 00 00 00 00 00 00')
 
+    @routine
     def learning_training_ground(self):
-        data =  (
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 66 00 00 00 06 00 00 00 01',
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 66 00 00 00 06 00 00 00 02',
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 66 00 00 00 06 00 00 00 03',
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 66 00 00 00 06 00 00 00 04',
-            '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 66 00 00 00 06 00 00 00 05'
-        )
+        data = tuple(CHALLENGE_LEVEL.bind(map_id = 0x66, mode = 6, level = level) for level in range(1, 6))
 
         c = 0
         while c < 6:
             for i in data:
-                self.send_packet_processing.SendPacket(i)
-                time.sleep(0.3)
+                yield Send(i)
+                yield Sleep(0.3)
                 for j in self.fight_84_packets():
-                    self.send_packet_processing.SendPacket(j)
-                    time.sleep(0.3)
+                    yield Send(j)
+                    yield Sleep(0.3)
             c += 1
-        time.sleep(0.3)
-        self.send_packet_processing.SendPacket('00 00 00 21 31 00 00 A5 9B 00 00 00 00 00 00 00 00 00 00 00 66 00 00 00 03 00 00 00 00 00 00 00 00')
+        yield Sleep(0.3)
+        yield Send('00 00 00 21 31 00 00 A5 9B 00 00 00 00 00 00 00 00 00 00 00 66 00 00 00 03 00 00 00 00 00 00 00 00')
 
+    @routine
     def trial_of_the_elf_king(self):
         data =  (
             '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 6A 00 00 00 0F 00 00 00 03'
@@ -221,13 +386,14 @@ class PetFightPacketManager:
 
         c = 0
         while c < 15:
-            self.send_packet_processing.SendPacket(data)
-            time.sleep(0.3)
+            yield Send(data)
+            yield Sleep(0.3)
             for j in self.fight_84_packets():
-                self.send_packet_processing.SendPacket(j)
-                time.sleep(0.3)
+                yield Send(j)
+                yield Sleep(0.3)
             c += 1
 
+    @routine
     def x_team_chamber(self):
         data =  (
             #开启副本
@@ -240,44 +406,43 @@ class PetFightPacketManager:
 
         c = 0
         while c < 3:
-            self.send_packet_processing.SendPacket(data[0])
-            time.sleep(0.3)
-            self.send_packet_processing.SendPacket(data[1])
-            time.sleep(0.3)
+            yield Send(data[0])
+            yield Sleep(0.3)
+            yield Send(data[1])
+            yield Sleep(0.3)
             for j in self.fight_84_packets():
-                self.send_packet_processing.SendPacket(j)
-                time.sleep(0.3)
+                yield Send(j)
+                yield Sleep(0.3)
             c += 1
-        time.sleep(0.3)
-        self.send_packet_processing.SendPacket(data[2])
+        yield Sleep(0.3)
+        yield Send(data[2])
 
+    @routine
     def brave_tower(self):
         data =  (
             '00 00 00 15 31 00 00 09 6E 00 00 00 00 00 00 00 00 00 00 00 00',
             '00 00 00 11 31 00 00 09 6F 00 00 00 00 00 00 00 00'
         )
 
-        self.send_packet_processing.SendPacket(data[0])
-        packet_data = self.receive_packet_analysis.wait_for_specific_data(2414, timeout = 3)
+        packet_data = yield Request(data[0], 2414, 3)
         packet_body = packet_data[17:]
         count = 80 - int.from_bytes(packet_body[:4], byteorder = 'big')
         bar_length = 10
-        self.send_packet_processing.SendPacket('00 00 00 11 31 00 00 B8 20 00 00 00 00 00 00 00 00')
-        time.sleep(0.3)
+        yield Send('00 00 00 11 31 00 00 B8 20 00 00 00 00 00 00 00 00')
+        yield Sleep(0.3)
         for i in range(count):
             progress = i / count
             bar = '>' * int(progress * bar_length)
             # print(f'当前进度: [{bar:<{bar_length}}] {int(progress * 100)}%')
             if self.message_callback:
                 self.message_callback(f'勇者之塔|进度|[{bar:<{bar_length}}] {i + 1}/{count}')
-            self.send_packet_processing.SendPacket(data[1])
-            if not self.receive_packet_analysis.wait_for_specific_data(2503, timeout = 1):
-                self.send_packet_processing.SendPacket(data[1])
-            time.sleep(0.3)
+            yield Request(data[1], 2503, 3)
+            yield Sleep(0.3)
             for j in self.fight_aggressive_packets():
-                self.send_packet_processing.SendPacket(j)
-                time.sleep(0.3)
+                yield Send(j)
+                yield Sleep(0.3)
 
+    @routine
     def titan_mines(self):
         data = (
             # 难度选择：简单
@@ -348,23 +513,19 @@ class PetFightPacketManager:
             '00 00 00 1D 31 00 00 A5 9C 00 00 00 00 00 00 00 00 00 00 00 68 00 00 00 03 00 00 00 04',
         )
 
-        self.send_packet_processing.SendPacket(data[2])  # 困难模式
-        time.sleep(0.3)
+        yield Send(data[2])  # 困难模式
+        yield Sleep(0.3)
         # 第一关
-        self.send_packet_processing.SendPacket(data[3])
-        if not self.receive_packet_analysis.wait_for_specific_data(2503, timeout = 1):
-                self.send_packet_processing.SendPacket(data[3])
-        time.sleep(0.3)
+        yield Request(data[3], 2503, 3)
+        yield Sleep(0.3)
         for j in self.fight_84_packets():
-            self.send_packet_processing.SendPacket(j)
-            time.sleep(0.3)
+            yield Send(j)
+            yield Sleep(0.3)
         # 第二关
-        time.sleep(0.3)
-        pet_ids_needed = (3437, )
-        self.check_backpack_pets(pet_ids_needed)
-        time.sleep(0.3)
-        self.send_packet_processing.SendPacket('00 00 00 6D 31 00 00 B3 DE 00 00 00 00 00 00 00 00 00 00 00 16 00 01 A6 1B 00 00 49 24 00 00 49 25 00 00 49 26 00 00 49 27 00 00 49 28 00 00 49 29 00 00 49 2A 00 00 49 2B 00 00 49 2C 00 00 49 2D 00 00 49 2E 00 00 49 2F 00 00 49 30 00 00 49 31 00 00 49 32 00 00 49 33 00 00 49 34 00 00 49 35 00 00 49 36 00 00 49 37 00 00 49 3C')
-        packet_data = self.receive_packet_analysis.wait_for_specific_data(46046, timeout = 3)[17:]
+        yield Sleep(0.3)
+        yield from self.steps('prepare_team', 'aggressive')
+        yield Sleep(0.3)
+        packet_data = (yield Request('00 00 00 6D 31 00 00 B3 DE 00 00 00 00 00 00 00 00 00 00 00 16 00 01 A6 1B 00 00 49 24 00 00 49 25 00 00 49 26 00 00 49 27 00 00 49 28 00 00 49 29 00 00 49 2A 00 00 49 2B 00 00 49 2C 00 00 49 2D 00 00 49 2E 00 00 49 2F 00 00 49 30 00 00 49 31 00 00 49 32 00 00 49 33 00 00 49 34 00 00 49 35 00 00 49 36 00 00 49 37 00 00 49 3C', 46046, 3))[17:]
         count = 16 - int(packet_data[19])
         bar_length = 10
         for i in range(count + 1):
@@ -372,40 +533,36 @@ class PetFightPacketManager:
             bar = '>' * int(progress * bar_length)
             if self.message_callback:
                 self.message_callback(f'泰坦矿洞|进度|[{bar:<{bar_length}}] {int(progress * 100)}%')
-            self.send_packet_processing.SendPacket(data[4])
-            if not self.receive_packet_analysis.wait_for_specific_data(2503, timeout = 1):
-                self.send_packet_processing.SendPacket(data[4])
-            time.sleep(0.3)
+            yield Request(data[4], 2503, 3)
+            yield Sleep(0.3)
             # 载入战斗
-            self.send_packet_processing.SendPacket('00 00 00 11 31 00 00 09 64 00 00 00 00 00 00 00 00')
-            time.sleep(0.3)
+            yield Send('00 00 00 11 31 00 00 09 64 00 00 00 00 00 00 00 00')
+            yield Sleep(0.3)
             # 艾欧使用有女初长成
-            self.send_packet_processing.SendPacket('00 00 00 15 31 00 00 09 65 00 00 00 00 00 00 00 00 00 00 79 8C')
-            time.sleep(0.3)
+            yield Send('00 00 00 15 31 00 00 09 65 00 00 00 00 00 00 00 00 00 00 79 8C')
+            yield Sleep(0.3)
             # 艾欧使用有女初长成
-            self.send_packet_processing.SendPacket('00 00 00 15 31 00 00 09 65 00 00 00 00 00 00 00 00 00 00 79 8C')
-            time.sleep(0.3)
+            yield Send('00 00 00 15 31 00 00 09 65 00 00 00 00 00 00 00 00 00 00 79 8C')
+            yield Sleep(0.3)
             # 发包逃跑，以防万一（防止的情况是出现了意料之外的情况导致我方和对方精灵都还没死，如果不发逃跑包就会卡死在对战里）
-            self.send_packet_processing.SendPacket('00 00 00 11 31 00 00 09 6A 00 00 00 00 00 00 00 00')
+            yield Send('00 00 00 11 31 00 00 09 6A 00 00 00 00 00 00 00 00')
             # 回血
-            self.send_packet_processing.SendPacket('00 00 00 11 31 00 00 B8 20 00 00 00 00 00 00 00 00')
+            yield Send('00 00 00 11 31 00 00 B8 20 00 00 00 00 00 00 00 00')
         # 第三关
         for i in range(5, 57):
-            self.send_packet_processing.SendPacket(data[i])
-            time.sleep(0.3)
+            yield Send(data[i])
+            yield Sleep(0.3)
         # 第四关
-        time.sleep(0.3)
-        pet_ids_needed = (3512, 3437, 3045)
-        self.check_backpack_pets(pet_ids_needed)
-        time.sleep(0.3)
-        self.send_packet_processing.SendPacket(data[-1])
-        if not self.receive_packet_analysis.wait_for_specific_data(2503, timeout = 1):
-            self.send_packet_processing.SendPacket(data[-1])
-        time.sleep(0.3)
+        yield Sleep(0.3)
+        yield from self.steps('prepare_team', '84')
+        yield Sleep(0.3)
+        yield Request(data[-1], 2503, 3)
+        yield Sleep(0.3)
         for j in self.fight_84_packets():
-            self.send_packet_processing.SendPacket(j)
-            time.sleep(0.3)
+            yield Send(j)
+            yield Sleep(0.3)
 
+    @routine
     def titan_vein(self):
         data = (
             # 难度选择：一般模式
@@ -422,11 +579,10 @@ class PetFightPacketManager:
             '00 00 00 15 31 00 00 A0 A9 00 00 00 00 00 00 00 00 00 00 20 8A',
         )
 
-        pet_ids_needed = (3512, 3437, 3045)
-        self.check_backpack_pets(pet_ids_needed)
-        time.sleep(0.3)
-        self.send_packet_processing.SendPacket(data[0])
-        time.sleep(0.3)
+        yield from self.steps('prepare_team', '84')
+        yield Sleep(0.3)
+        yield Send(data[0])
+        yield Sleep(0.3)
         # 第一关
         # self.send_packet_processing.SendPacket(data[1])
         # if not self.receive_packet_analysis.wait_for_specific_data(2503, timeout = 1):
@@ -436,13 +592,11 @@ class PetFightPacketManager:
         #     self.send_packet_processing.SendPacket(j)
         #     time.sleep(0.3)
         # 第二关
-        self.send_packet_processing.SendPacket(data[2])
-        if not self.receive_packet_analysis.wait_for_specific_data(2503, timeout = 1):
-                self.send_packet_processing.SendPacket(data[2])
-        time.sleep(0.3)
+        yield Request(data[2], 2503, 3)
+        yield Sleep(0.3)
         for j in self.fight_84_packets():
-            self.send_packet_processing.SendPacket(j)
-            time.sleep(0.3)
+            yield Send(j)
+            yield Sleep(0.3)
         # 第三关
         # for i in range(5, 57):
         #     self.send_packet_processing.SendPacket(data[i])
@@ -482,24 +636,26 @@ class PetFightPacketManager:
             '00 00 00 15 31 00 00 A0 A9 00 00 00 00 00 00 00 00 00 00 29 45',
         )
 
+    @routine
     def pony_last(self):
         c = 0
         while c < 1000:
-            self.send_packet_processing.SendPacket('00 00 00 15 31 00 00 A0 A9 00 00 00 00 00 00 00 00 00 00 29 46')
-            time.sleep(0.3)
+            yield Send('00 00 00 15 31 00 00 A0 A9 00 00 00 00 00 00 00 00 00 00 29 46')
+            yield Sleep(0.3)
             for j in self.fight_84_packets():
-                self.send_packet_processing.SendPacket(j)
-                time.sleep(0.3)
+                yield Send(j)
+                yield Sleep(0.3)
             c += 1
 
+    @routine
     def hamo(self):
         c = 0
         while c < 20:
-            self.send_packet_processing.SendPacket('00 00 00 15 31 00 00 A0 A9 00 00 00 00 00 00 00 00 00 00 19 59 ')
-            time.sleep(0.3)
+            yield Send('00 00 00 15 31 00 00 A0 A9 00 00 00 00 00 00 00 00 00 00 19 59 ')
+            yield Sleep(0.3)
             for j in self.fight_84_packets():
-                self.send_packet_processing.SendPacket(j)
-                time.sleep(0.3)
+                yield Send(j)
+                yield Sleep(0.3)
             c += 1
 
     def prepare_packets(self, battle_type):
@@ -532,11 +688,11 @@ class PetFightPacketManager:
             # 首发表姐，使用守御八方
             '00 00 00 15 31 00 00 09 65 00 00 00 00 00 00 00 00 00 00 7B 11',
             # 切换六界 (使用动态时间戳)
-            f'00 00 00 15 31 00 00 09 67 00 00 00 00 00 00 00 00 {liujie_timestamp}',
+            CHANGE_PET.bind(catch_time = liujie_timestamp),
             # 六界使用剑挥四方
             '00 00 00 15 31 00 00 09 65 00 00 00 00 00 00 00 00 00 00 4B 72',
             # 切换艾欧 (使用动态时间戳)
-            f'00 00 00 15 31 00 00 09 67 00 00 00 00 00 00 00 00 {aio_timestamp}',
+            CHANGE_PET.bind(catch_time = aio_timestamp),
             # 艾欧使用有女初长成
             '00 00 00 15 31 00 00 09 65 00 00 00 00 00 00 00 00 00 00 79 8C',
             # 艾欧使用有女初长成
@@ -596,9 +752,11 @@ class PetFightPacketManager:
         """创建战场类型的封包"""
         return ["Packet1_Battlefield", "Packet2_Battlefield", "Packet3_Battlefield"]
 
+    @routine
     def fire_buffer(self):
-        self.send_packet_processing.SendPacket('00 00 00 15 31 00 00 10 C4 00 00 00 00 00 00 00 00 02 63 43 9C')
-        self.send_packet_processing.SendPacket('00 00 00 15 31 00 00 10 C4 00 00 00 00 00 00 00 00 02 2B F9 3F')
+        yield Send('00 00 00 15 31 00 00 10 C4 00 00 00 00 00 00 00 00 02 63 43 9C')
+        yield Send('00 00 00 15 31 00 00 10 C4 00 00 00 00 00 00 00 00 02 2B F9 3F')
 
+    @routine
     def battery_dormant_switch(self):
-        self.send_packet_processing.SendPacket('00 00 00 15 31 00 00 A0 CA 00 00 00 00 00 00 00 00 00 00 00 00')
\ No newline at end of file
+        yield Send('00 00 00 15 31 00 00 A0 CA 00 00 00 00 00 00 00 00 00 00 00 00')
\ No newline at end of file
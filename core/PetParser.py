@@ -0,0 +1,132 @@
+import struct
+
+_COUNT = struct.Struct('>I')  # 列表开头的精灵数量
+_WAREHOUSE_RECORD = struct.Struct('>II')  # 仓库记录开头：精灵ID + 捕获时间戳
+_UINT = struct.Struct('>I')
+
+PET_RECORD_SIZE = 390  # 背包列表中每只精灵占用的字节数
+CATCH_TIME_OFFSET = 148  # 捕获时间戳在记录中的偏移
+
+
+class PetRecord:
+    """背包列表中的一只精灵，共享整个响应的 memoryview，字段在访问时才解码"""
+    __slots__ = ('view', 'offset')
+
+    def __init__(self, view, offset):
+        self.view = view
+        self.offset = offset
+
+    @property
+    def pet_id(self):
+        return _UINT.unpack_from(self.view, self.offset)[0]
+
+    @property
+    def catch_time(self):
+        return _UINT.unpack_from(self.view, self.offset + CATCH_TIME_OFFSET)[0]
+
+    @property
+    def catch_time_bytes(self):
+        """捕获时间戳的原始4字节，用于填入封包模板"""
+        start = self.offset + CATCH_TIME_OFFSET
+        return bytes(self.view[start:start + 4])
+
+    def __repr__(self):
+        return f"PetRecord(pet_id={self.pet_id}, catch_time={self.catch_time:08X})"
+
+
+def iter_bag(body):
+    """遍历背包列表（43706 响应的封包体）中的精灵记录，记录不完整的部分会被忽略"""
+    view = memoryview(body)
+    if len(view) < 4:
+        return
+    count = min(_COUNT.unpack_from(view, 0)[0], (len(view) - 4) // PET_RECORD_SIZE)
+    for offset in range(4, 4 + count * PET_RECORD_SIZE, PET_RECORD_SIZE):
+        yield PetRecord(view, offset)
+
+
+def warehouse_count(body):
+    """仓库列表中的精灵数量"""
+    return _COUNT.unpack_from(body, 0)[0] if len(body) >= 4 else 0
+
+
+def parse_warehouse(body):
+    """按记录长度单次遍历仓库列表（45543 响应的封包体），返回 {精灵ID: [捕获时间戳, ...]}
+
+    记录长度由封包体长度和精灵数量推算。推算的长度不能整除，或按它切分出的记录不符合记录开头的
+    格式（精灵ID 和捕获时间戳都不为 0）时返回 None。
+    """
+    if len(body) < 4:
+        return None
+    count, = _COUNT.unpack_from(body, 0)
+    if count == 0:
+        return {}
+    stride, rest = divmod(len(body) - 4, count)
+    if rest or stride < _WAREHOUSE_RECORD.size:
+        return None
+    index = {}
+    unpack_from = _WAREHOUSE_RECORD.unpack_from
+    for offset in range(4, 4 + count * stride, stride):
+        pet_id, catch_time = unpack_from(body, offset)
+        if not pet_id or not catch_time:
+            # 记录长度推算错误，切到了记录中间
+            return None
+        timestamps = index.get(pet_id)
+        if timestamps is None:
+            index[pet_id] = [catch_time]
+        else:
+            timestamps.append(catch_time)
+    return index
+
+
+def scan_warehouse(body, pet_ids):
+    """不依赖记录长度，直接在封包体中查找指定的精灵ID，时间戳位于精灵ID之后的4个字节"""
+    index = {}
+    for pet_id in pet_ids:
+        needle = pet_id.to_bytes(4, byteorder = 'big')
+        position = body.find(needle)
+        while position != -1 and position + 8 <= len(body):
+            index.setdefault(pet_id, []).append(int.from_bytes(body[position + 4:position + 8], byteorder = 'big'))
+            position = body.find(needle, position + 1)
+    return index
+
+
+def index_warehouse(body, pet_ids=()):
+    """返回仓库精灵索引，pet_ids 中按记录解析找不到的精灵再用扫描查找，仍然找不到的不在索引中"""
+    body = bytes(body)
+    index = parse_warehouse(body) or {}
+    unresolved = [pet_id for pet_id in pet_ids if pet_id not in index]
+    if unresolved:
+        index.update(scan_warehouse(body, unresolved))
+    return index
+
+
+if __name__ == '__main__':
+    # 用法：python -m core.PetParser [仓库精灵数]
+    import random, sys, time
+
+    pet_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(0)
+    records = [(pet_id, rng.randrange(1 << 30, 1 << 31)) for pet_id in rng.sample(range(1, 1 << 20), pet_count)]
+    body = _COUNT.pack(pet_count) + b''.join(_WAREHOUSE_RECORD.pack(*record) for record in records)
+    packet_data = bytes(17) + body
+    wanted = (records[-2][0], records[pet_count // 2][0], records[0][0])
+
+    def legacy():
+        found = {}
+        for pet_id in wanted:
+            pet_id_hex = pet_id.to_bytes(4, byteorder = 'big').hex()
+            for i in range(len(packet_data) - 8):
+                if packet_data[i:i+4] == bytes.fromhex(pet_id_hex):
+                    found[pet_id] = packet_data[i+4:i+8]
+                    break
+        return found
+
+    def indexed():
+        index = index_warehouse(packet_data[17:], wanted)
+        return {pet_id: index[pet_id][0].to_bytes(4, byteorder = 'big') for pet_id in wanted if pet_id in index}
+
+    for name, run in (('before', legacy), ('after', indexed)):
+        begin = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - begin
+        print(f"{name}: {pet_count} 只仓库精灵, 查找 {len(wanted)} 只, 找到 {len(result)} 只, {elapsed * 1000:.1f}ms")
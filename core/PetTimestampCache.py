@@ -0,0 +1,82 @@
+import json, os, re, threading
+
+_TIMESTAMP = re.compile(r'[0-9A-Fa-f]{8}')  # 4字节捕获时间戳的十六进制形式
+
+
+class PetTimestampCache:
+    """按账号保存在磁盘上的精灵捕获时间戳（精灵ID -> 十六进制时间戳）
+
+    同一只精灵的捕获时间戳不会改变，缓存后下次登录无需再获取仓库列表即可换上精灵。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.timestamps = {}
+        self.dirty = False
+        self.changes = 0  # 修改次数，保存期间又有修改时保存后仍为 dirty
+        self.load()
+
+    @classmethod
+    def for_account(cls, userid, directory=os.path.join('cache', 'pets')):
+        return cls(os.path.join(directory, f'{userid}.json'))
+
+    def load(self):
+        """读取缓存文件，文件不存在或已损坏时视为空缓存；不是8位十六进制的时间戳丢弃，下次保存时从文件中移除"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            items = data.items()
+        except (OSError, ValueError, AttributeError):
+            self.timestamps = {}
+            return {}
+        self.timestamps = {}
+        for pet_id, timestamp in items:
+            if isinstance(timestamp, str) and _TIMESTAMP.fullmatch(timestamp) and pet_id.isdigit():
+                self.timestamps[int(pet_id)] = timestamp.upper()
+            else:
+                self.dirty = True
+                self.changes += 1
+        return dict(self.timestamps)
+
+    def get(self, pet_id):
+        return self.timestamps.get(pet_id)
+
+    def snapshot(self):
+        """当前缓存的所有时间戳的副本"""
+        with self.lock:
+            return dict(self.timestamps)
+
+    def update(self, timestamps):
+        """合并新的时间戳，有变化时标记为需要保存"""
+        with self.lock:
+            for pet_id, timestamp in timestamps.items():
+                if self.timestamps.get(pet_id) != timestamp:
+                    self.timestamps[pet_id] = timestamp
+                    self.dirty = True
+                    self.changes += 1
+
+    def discard(self, pet_id):
+        """移除一条失效的缓存（如精灵已放生）"""
+        with self.lock:
+            if self.timestamps.pop(pet_id, None) is not None:
+                self.dirty = True
+                self.changes += 1
+
+    def save(self):
+        """有变化时写入缓存文件，先写临时文件再替换，写入中断不会损坏原文件；写入失败时保持 dirty，下次再保存"""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {str(pet_id): timestamp for pet_id, timestamp in sorted(self.timestamps.items())}
+            changes = self.changes
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_path, self.path)
+        with self.lock:
+            if self.changes == changes:
+                self.dirty = False
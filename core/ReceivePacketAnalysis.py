@@ -1,87 +1,76 @@
-import json, threading
+import logging
 from function.Algorithms import Algorithms
+from function.CommandTable import get_command_table
+from .PacketFramer import PacketFramer
+from .ResponseDispatcher import ResponseDispatcher
 
-class ReceivePacketAnalysis:
-    def __init__(self, algorithms: Algorithms, tcp_socket, userid, message_callback=None, disconnect_callback=None):
-        self.algorithms = algorithms
-        self.tcp_socket = tcp_socket
-        self.userid = userid
-        self.message_callback = message_callback
-        self.disconnect_callback = disconnect_callback  # 新增断开连接回调
-        with open('function/Command.json', 'r') as file:
-            self.command_dict = json.load(file)
-        self.currentCommandId = None
-        self.packet_data = None
-        self.data_ready_event = threading.Event()  # 创建一个事件对象
 
-    def receive_data(self):
-        buffer = b''
-        while True:
-            try:
-                if not self.tcp_socket:
-                    if self.message_callback:
-                        self.message_callback("连接|错误|未连接到服务器")
-                    break
+class PacketLogRecord:
+    """接收封包的日志记录，只保存原始封包，真正显示时才格式化十六进制预览"""
+    __slots__ = ('command_id', 'command_name', 'packet_data', 'preview_length')
+    level = logging.INFO
 
-                recv_data = self.tcp_socket.recv(1024)
-                if not recv_data:
-                    if self.message_callback:
-                        self.message_callback("连接|断开|服务器断开连接")
-                    # 通知上层连接已断开
-                    if self.disconnect_callback:
-                        self.disconnect_callback()
-                    break
+    def __init__(self, command_id, command_name, packet_data, preview_length=50):
+        self.command_id = command_id
+        self.command_name = command_name
+        self.packet_data = packet_data
+        self.preview_length = preview_length
 
-                buffer += recv_data
-                while len(buffer) >= 4:  # 至少要有4个字节来提取封包长度
-                    packet_length = int.from_bytes(buffer[:4], byteorder = 'big')
-                    if len(buffer) < packet_length:
-                        break
+    def hex_preview(self):
+        """返回形如 "00 00 00 11 31 ..." 的前 preview_length 个字符，只格式化需要的字节"""
+        preview = self.packet_data[:self.preview_length // 3 + 1].hex(' ').upper()
+        return preview[:self.preview_length]
 
-                    packet_data = buffer[:packet_length]
-                    buffer = buffer[packet_length:]
+    def __str__(self):
+        return f"接收|{self.command_name}|{self.hex_preview()}..."
 
-                    packet_data = self.algorithms.decrypt(packet_data)
-                    cipher = packet_data.hex().upper()
-                    formatted_hex_string = ' '.join([cipher[i:i+2] for i in range(0, len(cipher), 2)])
-                    command_value = int.from_bytes(packet_data[5:9], byteorder = 'big')
-                    command_str = self.command_dict.get(str(command_value), 'Unknown Command')
-                    if self.message_callback:
-                        self.message_callback(f"接收|{command_str}|{formatted_hex_string[:50]}...")
 
-                    # 检查是否需要分析当前封包
-                    if command_value == self.currentCommandId:
-                        # print(f"需要分析的封包: {formatted_hex_string}")
-                        self.packet_data = packet_data  # 返回封包数据以供主程序分析
-                        self.data_ready_event.set()  # 设置事件为已触发，通知数据已准备好
+class ReceivePacketAnalysis:
+    def __init__(self, algorithms: Algorithms, userid, message_callback=None, read_size=4096, log_level=logging.INFO, preview_length=50):
+        self.algorithms = algorithms
+        self.userid = userid
+        self.message_callback = message_callback
+        self.command_table = get_command_table()  # 进程内共享的命令表
+        self.dispatcher = ResponseDispatcher()  # 按命令号分发响应，支持多个等待者
+        self.framer = PacketFramer(read_size = read_size)  # 每次 recv_into 读取的字节数可配置
+        self.preview_length = preview_length  # 日志中十六进制预览的字符数
+        self.log_level = logging.INFO
+        self.set_log_level(log_level)
 
-                    if command_value == 1001:
-                        self.algorithms.InitKey(packet_data, self.userid)
-                        if self.message_callback:
-                            self.message_callback("初始化|成功|密钥初始化完成")
-                        result = int.from_bytes(packet_data[13:17], byteorder = 'big')
-                        self.algorithms.result = result
-                        if self.message_callback:
-                            self.message_callback(f"初始化|更新|Result: {result}")
-                        break
+    def set_log_level(self, log_level):
+        """设置封包日志的级别，低于该级别的封包不会生成日志记录"""
+        if isinstance(log_level, str):
+            log_level = logging.getLevelName(log_level.upper())
+        if isinstance(log_level, int):
+            self.log_level = log_level
 
-            except Exception as e:
-                if self.message_callback:
-                    self.message_callback(f"接收|错误|{str(e)}")
-                # 异常时也通知上层连接已断开
-                if self.disconnect_callback:
-                    self.disconnect_callback()
-                break
+    def handle_frame(self, frame):
+        """解密并处理 GameProtocol 分帧得到的一个完整封包"""
+        packet_data = self.algorithms.decrypt(frame)
+        command_value = int.from_bytes(packet_data[5:9], byteorder = 'big')
+        if self.message_callback and PacketLogRecord.level >= self.log_level:
+            command_name = self.command_table.name(command_value)
+            self.message_callback(PacketLogRecord(command_value, command_name, packet_data, self.preview_length))
 
-    def wait_for_specific_data(self, command_id, timeout = 5):
-        self.currentCommandId = command_id
-        self.data_ready_event.clear()
-        if self.data_ready_event.wait(timeout):
-            data = self.packet_data
-            self.packet_data = None
-            self.currentCommandId = None
-            return data
-        else:
+        if command_value == 1001:
+            self.algorithms.InitKey(packet_data, self.userid)
+            if self.message_callback:
+                self.message_callback("初始化|成功|密钥初始化完成")
+            result = int.from_bytes(packet_data[13:17], byteorder = 'big')
+            self.algorithms.result = result
             if self.message_callback:
-                self.message_callback(f"等待|超时|命令 {command_id} 响应超时")
-            return None
\ No newline at end of file
+                self.message_callback(f"初始化|更新|Result: {result}")
+
+        # 交给等待该命令号的等待者（密钥更新之后再分发）
+        self.dispatcher.dispatch(command_value, packet_data)
+
+    def expect(self, command_id, predicate = None):
+        """登记等待指定命令号的响应，应在发送请求之前调用，返回 Future"""
+        return self.dispatcher.expect(command_id, predicate)
+
+    def wait_for_specific_data(self, command_id, timeout = 5, predicate = None, future = None):
+        """等待指定命令号的响应，可传入先前 expect 得到的 future"""
+        data = self.dispatcher.wait(command_id, timeout, predicate, future)
+        if data is None and self.message_callback:
+            self.message_callback(f"等待|超时|命令 {command_id} 响应超时")
+        return data
\ No newline at end of file
@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import CancelledError, Future, TimeoutError
+
+
+class ResponseDispatcher:
+    """按命令号把响应封包分发给等待者
+
+    每个命令号可以同时有多个等待者（按登记顺序各取一个响应），等待者可以附带一个
+    封包过滤条件。没有等待者领取的响应直接丢弃，因此等待者应在发送请求之前登记。
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()  # Future 的回调可能在持锁时重入
+        self.waiters = {}  # 命令号 -> [(过滤条件, Future), ...]
+        self.listeners = []  # 每个封包都会通知的回调，不领取封包
+
+    def add_listener(self, listener):
+        """添加一个以 (命令号, 封包数据) 调用的监听器，在接收线程（或事件循环）中调用，应尽快返回"""
+        # 替换列表而不是原地修改，监听器可以在被调用时移除自己
+        self.listeners = self.listeners + [listener]
+
+    def remove_listener(self, listener):
+        self.listeners = [item for item in self.listeners if item is not listener]
+
+    def expect(self, command_id, predicate=None) -> Future:
+        """登记一个等待者，返回在响应到达时完成的 Future
+
+        Args:
+            command_id: 等待的命令号
+            predicate: 可选的过滤条件，接收封包数据，返回 True 时才算匹配
+        """
+        future = Future()
+        with self.lock:
+            self.waiters.setdefault(command_id, []).append((predicate, future))
+        return future
+
+    def wait(self, command_id, timeout=5, predicate=None, future=None):
+        """等待指定命令号的响应，超时或连接断开时返回 None"""
+        if future is None:
+            future = self.expect(command_id, predicate)
+        try:
+            return future.result(timeout)
+        except (TimeoutError, CancelledError):
+            self.discard(command_id, future)
+            # 超时与响应到达可能同时发生，移除等待者之后再确认一次
+            if future.done() and not future.cancelled():
+                return future.result()
+            return None
+
+    def dispatch(self, command_id, packet_data):
+        """分发一个响应封包，返回是否有等待者领取"""
+        for listener in self.listeners:
+            listener(command_id, packet_data)
+        with self.lock:
+            waiters = self.waiters.get(command_id)
+            while waiters:
+                index = next((index for index, (predicate, future) in enumerate(waiters)
+                              if predicate is None or predicate(packet_data)), None)
+                if index is None:
+                    break
+                future = waiters.pop(index)[1]
+                # 等待者可能已被取消，此时交给下一个匹配的等待者
+                if future.set_running_or_notify_cancel():
+                    future.set_result(packet_data)
+                    return True
+        return False
+
+    def discard(self, command_id, future):
+        """移除一个不再等待的等待者"""
+        with self.lock:
+            waiters = self.waiters.get(command_id)
+            if waiters:
+                waiters[:] = [waiter for waiter in waiters if waiter[1] is not future]
+                if not waiters:
+                    del self.waiters[command_id]
+
+    def cancel_all(self):
+        """取消所有等待者（连接断开时调用）"""
+        with self.lock:
+            waiters, self.waiters = self.waiters, {}
+        for command_waiters in waiters.values():
+            for _, future in command_waiters:
+                future.cancel()
+
+    def pending_count(self):
+        """当前等待中的等待者数量"""
+        with self.lock:
+            return sum(len(waiters) for waiters in self.waiters.values())
@@ -1,52 +1,39 @@
 from function.Algorithms import Algorithms
+from .PacketTemplate import as_packet
 
 class SendPacketProcessing:
     def __init__(self, algorithms: Algorithms, tcp_socket, userid, message_callback=None):
         self.algorithms = algorithms
         self.tcp_socket = tcp_socket
         self.message_callback = message_callback
-        self.length = None
-        self.version = None
-        self.cmd_id = None
         self.user_id = userid.to_bytes(length = 4, byteorder = 'big')
-        self.result = None
-        self.body = None
-
-    def parse_packet(self, packet):
-        if len(packet) >= 17:
-            self.length = packet[0:4]
-            self.version = packet[4]
-            self.cmd_id = packet[5:9]
-            # self.user_id = packet[9:13]
-            # self.user_id = self.user_id
-            self.result = packet[13:17]
-            self.body = packet[17:]
-            # print(f"Length: {int.from_bytes(self.length, byteorder = 'big')}")
-            # print(f"Version: {self.version}")
-            # print(f"CmdId: {int.from_bytes(self.cmd_id, byteorder = 'big')}")
-            # print(f"UserId: {int.from_bytes(self.user_id, byteorder = 'big')}")
-            # print(f"Result: {int.from_bytes(self.result, byteorder = 'big')}")
-            # print(f"Body: {self.body.hex().upper()}")
-        return self
 
     def GroupPacket(self, packet):
-        # 检查十六进制字符串的格式是否正确
+        """组装封包：packet 可以是十六进制字符串、PacketTemplate 或 BoundPacket，只需计算序列号并拼接封包头"""
         try:
-            bytes.fromhex(packet)
+            packet = as_packet(packet)
         except ValueError:
+            # 十六进制字符串的格式不正确
             if self.message_callback:
                 self.message_callback("发送|错误|封包数据格式错误")
             return 0
-        packet_bytes = bytes.fromhex(packet)
-        self.parse_packet(packet_bytes)
-        self.result = self.algorithms.calculate_result(int.from_bytes(self.cmd_id, byteorder = 'big'), self.body)
-        return self.length + self.version.to_bytes(length = 1, byteorder = 'big') + self.cmd_id + self.user_id + self.result.to_bytes(length = 4, byteorder = 'big') + self.body
+        result = self.algorithms.calculate_result(packet.command_id, packet.body)
+        return packet.header + self.user_id + result.to_bytes(length = 4, byteorder = 'big') + packet.body
 
-    def SendPacket(self, packed_message):
-        packed_message = self.GroupPacket(packed_message)
+    def EncryptPacket(self, packet):
+        """组装并加密封包，返回可直接发送的数据；封包格式错误时返回 0"""
+        packed_message = self.GroupPacket(packet)
+        if not packed_message:
+            return 0
         # if self.message_callback:
         #     self.message_callback(f'发送|未加密|{packed_message.hex().upper()[:50]}...')
-        message_encrypt = self.algorithms.encrypt(packed_message)
+        return self.algorithms.encrypt(packed_message)
+
+    def SendPacket(self, packed_message):
+        """组包、加密并交给 tcp_socket（连接的 SendPipeline）发送，只在事件循环线程中调用"""
+        message_encrypt = self.EncryptPacket(packed_message)
+        if not message_encrypt:
+            return
         # if self.message_callback:
         #     self.message_callback(f'发送|加密后|{message_encrypt.hex().upper()[:50]}...')
         self.tcp_socket.send(message_encrypt)
@@ -0,0 +1,122 @@
+import asyncio, time
+
+
+class SendPipeline:
+    """发送管线：同一轮事件循环中发出的封包合并为一次 transport.write
+
+    封包在 SendPacketProcessing 中按调用顺序组包、加密（都在事件循环线程中），序列号的顺序与发送顺序一致；
+    加密后的数据先放入队列，当前回调结束后统一写出，减少系统调用。排队超过 max_batch_bytes 时立即写出。
+    流程中需要间隔的封包由 PacingEngine 在提交前等待，不会被合并。
+    """
+
+    def __init__(self, transport, max_batch_bytes=16384, loop=None):
+        self.transport = transport
+        self.max_batch_bytes = max_batch_bytes  # 一次 write 最多合并的字节数
+        self.loop = loop or asyncio.get_running_loop()
+        self.queue = []
+        self.queued_bytes = 0
+        self.scheduled = False  # 本轮是否已安排写出
+        # 统计
+        self.packets = 0
+        self.writes = 0
+        self.bytes_sent = 0
+        self.max_depth = 0
+
+    def send(self, data):
+        """放入发送队列，本轮回调结束后写出；与 socket.send 的接口一致，供 SendPacketProcessing 使用"""
+        if self.transport.is_closing():
+            raise ConnectionError("连接已关闭")
+        self.queue.append(data)
+        self.queued_bytes += len(data)
+        if len(self.queue) > self.max_depth:
+            self.max_depth = len(self.queue)
+        if self.queued_bytes >= self.max_batch_bytes:
+            self.flush()
+        elif not self.scheduled:
+            self.scheduled = True
+            self.loop.call_soon(self.flush)
+        return len(data)
+
+    def flush(self):
+        """立即写出队列中的封包"""
+        self.scheduled = False
+        if not self.queue:
+            return
+        queue, size = self.queue, self.queued_bytes
+        self.queue = []
+        self.queued_bytes = 0
+        if self.transport.is_closing():
+            return
+        self.transport.write(queue[0] if len(queue) == 1 else b''.join(queue))
+        self.packets += len(queue)
+        self.writes += 1
+        self.bytes_sent += size
+
+    def queue_depth(self):
+        """当前排队等待写出的封包数"""
+        return len(self.queue)
+
+    def stats(self):
+        """返回发送统计：封包数、write 次数、字节数、平均每次 write 的字节数、最大队列深度"""
+        return {
+            'packets': self.packets,
+            'writes': self.writes,
+            'bytes': self.bytes_sent,
+            'bytes_per_write': self.bytes_sent / self.writes if self.writes else 0,
+            'max_depth': self.max_depth,
+            'queue_depth': len(self.queue),
+        }
+
+
+if __name__ == '__main__':
+    # 用法：python -m core.SendPipeline [封包数]
+    # 比较逐个 transport.write 与发送管线合并写出的次数和耗时
+    import socket, sys
+    from function.Algorithms import Algorithms
+    from .SendPacketProcessing import SendPacketProcessing
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    packet = '00 00 00 15 31 00 00 09 65 00 00 00 00 00 00 00 00 00 00 79 8C'
+
+    class DirectSocket:
+        def __init__(self, transport):
+            self.transport = transport
+            self.writes = 0
+
+        def send(self, data):
+            self.transport.write(data)
+            self.writes += 1
+            return len(data)
+
+    async def measure(make_socket):
+        loop = asyncio.get_running_loop()
+        client, server = socket.socketpair()
+        server.setblocking(False)
+        reader = loop.create_task(drain(loop, server))
+        transport, _ = await loop.create_connection(asyncio.Protocol, sock = client)
+        sink = make_socket(transport)
+        processing = SendPacketProcessing(Algorithms(), sink, 123456)
+        started = time.perf_counter()
+        # 每轮回调发出 10 个封包，模拟流程中连续发送的封包
+        for index in range(count):
+            processing.SendPacket(packet)
+            if index % 10 == 9:
+                await asyncio.sleep(0)
+        if isinstance(sink, SendPipeline):
+            sink.flush()
+        elapsed = time.perf_counter() - started
+        transport.close()
+        await reader
+        server.close()
+        return elapsed, sink
+
+    async def drain(loop, sock):
+        while await loop.sock_recv(sock, 65536):
+            pass
+
+    elapsed, sink = asyncio.run(measure(DirectSocket))
+    print(f"逐个写出: {count} 个封包, {sink.writes} 次 write, {elapsed:.3f}s")
+    elapsed, pipeline = asyncio.run(measure(SendPipeline))
+    stats = pipeline.stats()
+    print(f"发送管线: {stats['packets']} 个封包, {stats['writes']} 次 write, "
+          f"平均 {stats['bytes_per_write']:.0f} 字节/次, 最大队列 {stats['max_depth']}, {elapsed:.3f}s")
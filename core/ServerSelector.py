@@ -0,0 +1,138 @@
+import itertools, logging, socket, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from .Login import GAME_SERVER_HOST, SERVER_PORTS
+from .config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+
+def probe_server(address, timeout=2.0, handshake=None):
+    """探测一个游戏服务器，返回建立 TCP 连接的耗时（秒），失败时返回 None
+
+    给出 handshake（如登录封包）时，连接后发送它并等待第一个响应字节，返回从开始连接到收到响应的耗时。
+    """
+    begin = time.perf_counter()
+    try:
+        with socket.create_connection(address, timeout = timeout) as tcp_socket:
+            if handshake:
+                tcp_socket.sendall(handshake)
+                if not tcp_socket.recv(1):
+                    return None
+            return time.perf_counter() - begin
+    except OSError:
+        return None
+
+
+class ServerSelector:
+    """按延迟为账号选择游戏服务器
+
+    并发探测各服务器，按延迟排序后缓存 ttl 秒。best() 返回最快的服务器；pick() 在最快的 top_k 个
+    服务器之间轮流分配，避免所有账号都挤在同一个服务器上。所有服务器都无法连接时返回 default。
+    界面线程中不要调用会探测的方法，先用 warm() 在后台探测，再用 cached_ranking() 取结果。
+    """
+
+    def __init__(self, addresses=None, top_k=1, ttl=300, timeout=2.0, attempts=2, max_workers=16, default=32, handshake=None):
+        if addresses is None:
+            addresses = {server: (GAME_SERVER_HOST, port) for server, port in SERVER_PORTS.items()}
+        self.addresses = addresses  # 服务器编号 -> (地址, 端口)
+        self.top_k = top_k
+        self.ttl = ttl
+        self.timeout = timeout
+        self.attempts = attempts  # 每个服务器探测的次数，取最小值
+        self.max_workers = max_workers
+        self.default = default
+        self.handshake = handshake
+        self.lock = threading.Lock()  # 同一时间只进行一轮探测，其余调用者等待结果
+        self.latencies = {}  # 服务器编号 -> 延迟（秒），无法连接时为 None
+        self._ranking = []
+        self._expires_at = 0
+        self._counter = itertools.count()
+
+    def probe(self):
+        """并发探测所有服务器，返回 {服务器编号: 延迟或 None}"""
+        def measure(server):
+            samples = [probe_server(self.addresses[server], self.timeout, self.handshake) for _ in range(self.attempts)]
+            samples = [sample for sample in samples if sample is not None]
+            return min(samples) if samples else None
+
+        servers = list(self.addresses)
+        with ThreadPoolExecutor(max_workers = min(self.max_workers, len(servers)) or 1, thread_name_prefix = 'server-probe') as executor:
+            return dict(zip(servers, executor.map(measure, servers)))
+
+    def ranking(self, refresh=False):
+        """可连接的服务器编号，按延迟从低到高排列"""
+        with self.lock:
+            if refresh or time.monotonic() >= self._expires_at:
+                latencies = self.probe()
+                self._ranking = sorted((server for server, latency in latencies.items() if latency is not None),
+                                       key = latencies.__getitem__)
+                self.latencies = latencies
+                # 最后更新，cached_ranking() 据此判断是否已有探测结果
+                self._expires_at = time.monotonic() + self.ttl
+                logger.info('服务器延迟: %s', ', '.join(f'{server}服 {self.latencies[server] * 1000:.0f}ms' for server in self._ranking[:5]) or '全部无法连接')
+            return self._ranking
+
+    def warm(self):
+        """缓存已过期且没有正在进行的探测时，在后台线程中开始探测，立即返回"""
+        if time.monotonic() < self._expires_at or self.lock.locked():
+            return
+        threading.Thread(target = self.ranking, name = 'server-probe-warm', daemon = True).start()
+
+    def cached_ranking(self):
+        """最近一次探测的结果，不会阻塞；还没有探测结果时返回 None，结果过期时在后台重新探测"""
+        self.warm()
+        return self._ranking if self._expires_at else None
+
+    def best(self):
+        """延迟最低的服务器"""
+        ranking = self.ranking()
+        return ranking[0] if ranking else self.default
+
+    def pick(self):
+        """在延迟最低的 top_k 个服务器之间轮流选择一个"""
+        candidates = self.ranking()[:self.top_k]
+        if not candidates:
+            return self.default
+        return candidates[next(self._counter) % len(candidates)]
+
+
+_selector = None
+_selector_lock = threading.Lock()
+
+
+def get_server_selector():
+    """进程内共享的服务器选择器"""
+    global _selector
+    with _selector_lock:
+        if _selector is None:
+            _selector = ServerSelector()
+        return _selector
+
+
+def configured_server(message_callback=None):
+    """按设置选择游戏服务器，开启自动选择时使用后台探测到的延迟最低的服务器，不等待探测"""
+    server = config_manager.get_int('通用设置', 'server', 32)
+    if config_manager.get_bool('通用设置', 'auto_server'):
+        ranking = get_server_selector().cached_ranking()
+        if ranking:
+            server = ranking[0]
+            message = f"服务器|自动选择|{server}服"
+        elif ranking is None:
+            message = f"服务器|自动选择未完成|正在探测延迟，使用{server}服"
+        else:
+            message = f"服务器|自动选择失败|所有服务器都无法连接，使用{server}服"
+        if message_callback:
+            message_callback(message)
+    return server
+
+
+if __name__ == '__main__':
+    # 用法：python -m core.ServerSelector
+    selector = ServerSelector()
+    begin = time.perf_counter()
+    ranking = selector.ranking()
+    print(f"探测 {len(selector.addresses)} 个服务器耗时 {time.perf_counter() - begin:.2f}s")
+    for server in ranking:
+        print(f"{server}服: {selector.latencies[server] * 1000:.1f}ms")
+    print(f"无法连接: {sorted(server for server, latency in selector.latencies.items() if latency is None)}")
@@ -0,0 +1,38 @@
+# 战斗脚本使用的出战精灵（按背包顺序，第一只为首发）
+TEAM_PRESETS = {
+    '84': (3512, 3437, 3045),  # 表姐首发，六界、艾欧替换，对应 fight_84_packets
+    'aggressive': (3437,),  # 艾欧单挑，对应 fight_aggressive_packets
+}
+
+
+def team_preset(team):
+    """把预设名称或精灵ID序列统一为精灵ID元组"""
+    if isinstance(team, str):
+        try:
+            return TEAM_PRESETS[team]
+        except KeyError:
+            raise ValueError(f"Unknown team preset: {team}") from None
+    return tuple(team)
+
+
+def team_diff(bag_pets, team):
+    """计算把背包调整为 team（包括顺序）需要移动的精灵
+
+    按背包顺序保留与 team 开头一致的精灵，其余放入仓库；放入仓库后背包中剩下的精灵依次前移，
+    再把 team 中缺少的精灵按顺序放入背包。
+
+    Args:
+        bag_pets: 背包中的精灵（带 pet_id 属性，如 PetRecord），按背包顺序
+        team: 需要的精灵ID序列
+
+    Returns:
+        (需要放入仓库的精灵列表, 需要放入背包的精灵ID元组)
+    """
+    kept = 0
+    to_warehouse = []
+    for pet in bag_pets:
+        if kept < len(team) and pet.pet_id == team[kept]:
+            kept += 1
+        else:
+            to_warehouse.append(pet)
+    return to_warehouse, tuple(team[kept:])
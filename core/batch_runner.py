@@ -0,0 +1,108 @@
+# coding:utf-8
+import argparse
+import asyncio
+import csv
+import time
+from collections import namedtuple
+
+from .AsyncTransport import AsyncGameConnection
+from .config_manager import config_manager
+from .log_manager import configured_level, setup_logging
+from .ServerSelector import ServerSelector
+
+Account = namedtuple('Account', 'userid password server')
+AccountResult = namedtuple('AccountResult', 'userid server success elapsed detail')
+
+
+def load_accounts(path, default_server=32):
+    """读取账号列表，每行格式为 userid,password[,server]，# 开头的行为注释"""
+    accounts = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            row = [field.strip() for field in row]
+            if not row or not row[0] or row[0].startswith('#'):
+                continue
+            if len(row) < 2:
+                raise ValueError(f"账号格式错误: {','.join(row)}")
+            server = int(row[2]) if len(row) > 2 and row[2] else default_server
+            accounts.append(Account(int(row[0]), row[1], server))
+    return accounts
+
+
+class BatchRunner:
+    """无界面的多账号日常执行器，同时执行的账号数由 concurrency 限制"""
+
+    def __init__(self, accounts, concurrency=4, login_timeout=10, message_callback=None, selector=None):
+        self.accounts = accounts
+        self.selector = selector  # 给出时，未指定服务器（server 为 None）的账号由它分配
+        self.concurrency = concurrency
+        self.login_timeout = login_timeout
+        self.message_callback = message_callback  # 以 (userid, message) 调用
+
+    def run(self):
+        """执行所有账号的日常任务，按账号列表顺序返回结果"""
+        accounts = self.accounts
+        if self.selector:
+            accounts = [account if account.server is not None else account._replace(server = self.selector.pick())
+                        for account in accounts]
+        return asyncio.run(self.run_all(accounts))
+
+    async def run_all(self, accounts):
+        """在同一个事件循环中执行所有账号，同时执行的账号数不超过 concurrency"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_limited(account):
+            async with semaphore:
+                return await self.run_account(account)
+
+        return list(await asyncio.gather(*(run_limited(account) for account in accounts)))
+
+    async def run_account(self, account):
+        """登录单个账号并执行日常任务"""
+        started = time.perf_counter()
+        connection = AsyncGameConnection(account.userid, self._account_callback(account.userid))
+        try:
+            await connection.connect(account.password, account.server, self.login_timeout)
+            detail = await connection.execute_daily_tasks()
+            success = '×' not in detail
+        except Exception as e:
+            detail = f"错误：{str(e)}"
+            success = False
+        finally:
+            connection.close()
+        return AccountResult(account.userid, account.server, success, time.perf_counter() - started, detail)
+
+    def _account_callback(self, userid):
+        if not self.message_callback:
+            return None
+        return lambda message: self.message_callback(userid, message)
+
+
+def format_results(results):
+    """把执行结果格式化为表格文本"""
+    lines = [f"{'米米号':<12}{'服务器':<8}{'状态':<6}{'耗时(秒)':<10}详情"]
+    for result in results:
+        detail = result.detail.replace('\n', ' ')
+        lines.append(f"{result.userid:<12}{result.server:<8}{'成功' if result.success else '失败':<6}{result.elapsed:<10.1f}{detail}")
+    succeeded = sum(result.success for result in results)
+    lines.append(f"共 {len(results)} 个账号，成功 {succeeded} 个，失败 {len(results) - succeeded} 个")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    # 用法：python -m core.batch_runner accounts.csv -c 4
+    parser = argparse.ArgumentParser(description='多账号一键日常')
+    parser.add_argument('accounts', help='账号列表文件，每行 userid,password[,server]')
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help='同时执行的账号数')
+    parser.add_argument('-s', '--server', type=int, default=32, help='未指定服务器的账号使用的服务器')
+    parser.add_argument('-k', '--spread', type=int, default=0,
+                        help='未指定服务器的账号分配到延迟最低的 K 个服务器（0 表示使用 --server）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出每个账号的消息')
+    args = parser.parse_args()
+    setup_logging(configured_level(config_manager))
+
+    callback = (lambda userid, message: print(f"[{userid}] {message}")) if args.verbose else None
+    selector = ServerSelector(top_k=args.spread, default=args.server) if args.spread > 0 else None
+    accounts = load_accounts(args.accounts, None if selector else args.server)
+    runner = BatchRunner(accounts, args.concurrency, message_callback=callback, selector=selector)
+    print(format_results(runner.run()))
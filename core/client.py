@@ -1,11 +1,13 @@
 # coding:utf-8
 from PySide6.QtCore import QObject, Signal
 import threading
+from .MessageBatcher import MessageBatcher
 
 
 class WebSocketClient(QObject):
     """WebSocket客户端，用于处理游戏通信和登录管理"""
-    new_message = Signal(str)  # 新消息信号
+    new_message = Signal(object)  # 新消息信号（字符串或 PacketLogRecord，显示时再转换为文本）
+    new_messages = Signal(list)  # 工作线程产生的消息，按批发送
     connection_status_changed = Signal(bool)  # 连接状态变化信号
 
     def __init__(self):
@@ -13,6 +15,16 @@ class WebSocketClient(QObject):
         self.is_connected = False
         self.main_instance = None
         self.current_userid = None
+        self.running_tasks = set()  # 正在等待的 run_task 提交，停止任务时取消
+        self.tasks_lock = threading.Lock()
+        # 事件循环线程和日常任务线程的消息攒成批再发给界面，界面处理完一批后调用 message_batcher.acknowledge()
+        self.message_batcher = MessageBatcher(self.new_messages.emit, interval=0.1, batch_size=200, capacity=10000)
+
+    @property
+    def loop_thread(self):
+        """连接的收发和日常任务都在共享的事件循环线程中执行，第一次使用时才导入 AsyncTransport 并启动线程"""
+        from .AsyncTransport import get_event_loop_thread
+        return get_event_loop_thread()
 
     def login_game(self, userid, password):
         """登录游戏"""
@@ -21,10 +33,6 @@ class WebSocketClient(QObject):
             if isinstance(userid, str):
                 userid = int(userid)
 
-            # 导入Main类并创建实例
-            from .main import Main
-            self.main_instance = Main()
-
             # 尝试连接
             if self.connect_to_server(userid, password):
                 self.new_message.emit(f"登录|成功|用户ID: {userid}")
@@ -57,53 +65,53 @@ class WebSocketClient(QObject):
 
     def connect_to_server(self, userid, password):
         """连接到服务器"""
+        connection = None
         try:
-            if self.main_instance:
-                # 传递消息回调函数和断开连接回调函数
-                message_callback = lambda msg: self.new_message.emit(msg)
-                disconnect_callback = self.handle_disconnect
-                self.main_instance.initialize(userid, password, message_callback, disconnect_callback)
-                self.is_connected = True
-                self.current_userid = userid
-                # 发送连接状态变化信号
-                self.connection_status_changed.emit(True)
-                # 启动接收线程
-                self.start_receive_thread()
-                return True
+            # 传递消息回调函数和断开连接回调函数
+            message_callback = self.message_batcher.start()
+            from .AsyncTransport import AsyncGameConnection
+            connection = AsyncGameConnection(userid, message_callback, self.handle_disconnect)
+            self.main_instance = connection
+            self.loop_thread.run(connection.connect(password))
+            self.is_connected = True
+            self.current_userid = userid
+            # 发送连接状态变化信号
+            self.connection_status_changed.emit(True)
+            return True
         except Exception as e:
             self.new_message.emit(f"连接|失败|{str(e)}")
+            if connection:
+                self.loop_thread.call_soon(connection.close)
+            self.main_instance = None
             self.is_connected = False
             self.connection_status_changed.emit(False)
             return False
 
-    def start_receive_thread(self):
-        """启动接收数据线程"""
-        if self.main_instance and self.main_instance.receive_packet_analysis:
-            receive_thread = threading.Thread(
-                target=self.receive_data_wrapper,
-                daemon=True
-            )
-            receive_thread.start()
-
-    def receive_data_wrapper(self):
-        """接收数据包装器"""
+    def run_task(self, func, *args):
+        """在事件循环线程中执行 func（如 pet_fight_packet_manager 的流程方法）并等待结果，在工作线程中调用"""
+        future = self.loop_thread.call(func, *args)
+        with self.tasks_lock:
+            self.running_tasks.add(future)
         try:
-            self.main_instance.receive_packet_analysis.receive_data()
-        except Exception as e:
-            self.new_message.emit(f"接收|错误|{str(e)}")
-            # 接收错误时也要更新连接状态
-            self.handle_disconnect()
+            return future.result()
+        finally:
+            with self.tasks_lock:
+                self.running_tasks.discard(future)
+
+    def cancel_tasks(self):
+        """取消所有正在执行的 run_task"""
+        with self.tasks_lock:
+            futures = list(self.running_tasks)
+        for future in futures:
+            future.cancel()
 
     def handle_disconnect(self):
         """处理连接断开"""
         if self.is_connected:
             self.is_connected = False
             # 清理资源
-            if self.main_instance and self.main_instance.tcp_socket:
-                try:
-                    self.main_instance.tcp_socket.close()
-                except:
-                    pass  # 忽略关闭时的错误
+            if self.main_instance:
+                self.loop_thread.call_soon(self.main_instance.close)
             self.current_userid = None
             self.main_instance = None
             # 发送状态变化信号
@@ -116,7 +124,7 @@ class WebSocketClient(QObject):
             return False
 
         try:
-            self.main_instance.send_packet_processing.SendPacket(message)
+            self.run_task(self.main_instance.send, message)
             self.new_message.emit(f"发送|{message[:20]}...")
             return True
         except Exception as e:
@@ -130,17 +138,13 @@ class WebSocketClient(QObject):
             user_msg = f"登录|断开|用户ID: {self.current_userid}" if self.current_userid else "连接|断开|已断开连接"
             self.new_message.emit(user_msg)
 
-            # 关闭TCP连接
-            if self.main_instance and self.main_instance.tcp_socket:
-                try:
-                    self.main_instance.tcp_socket.close()
-                except Exception as e:
-                    self.new_message.emit(f"断开|错误|{str(e)}")
-
-            # 重置状态
+            # 先重置状态再关闭连接，连接关闭的回调（handle_disconnect）不会再报告断开
+            connection = self.main_instance
             self.is_connected = False
             self.current_userid = None
             self.main_instance = None
+            if connection:
+                self.loop_thread.call_soon(connection.close)
             self.connection_status_changed.emit(False)
 
             return True
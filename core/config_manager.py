@@ -1,20 +1,31 @@
 # coding:utf-8
+import atexit
 import configparser
 import base64
 import os
+import threading
+from contextlib import contextmanager
 from typing import Optional, Tuple
 
 
 class ConfigManager:
     """配置管理器，处理配置文件的读取、保存和密码加密"""
     
-    def __init__(self, config_file='config.ini'):
+    def __init__(self, config_file='config.ini', flush_delay=0.5):
         self.config_file = config_file
         self.config = configparser.ConfigParser()
+        self.flush_delay = flush_delay  # 修改后延迟写入文件的时间（秒），期间的多次修改只写一次
+        self.lock = threading.RLock()
+        self._batch_depth = 0
+        self._dirty = False
+        self._flush_timer = None
+        self._typed_cache = {}  # (section, key, 类型) -> 转换后的值
         self.load_config()
+        atexit.register(self.flush)
     
     def load_config(self):
         """加载配置文件"""
+        self._typed_cache.clear()
         if os.path.exists(self.config_file):
             self.config.read(self.config_file, encoding='utf-8')
         else:
@@ -35,6 +46,7 @@ class ConfigManager:
             'debug_mode': 'False',
             'auto_battle': 'False',
             'server': '32',
+            'auto_server': 'False',
             'log_level': 'INFO',
             'max_retry': '3',
             'capability_equipment': '装备1',
@@ -68,9 +80,57 @@ class ConfigManager:
         self.save_config()
     
     def save_config(self):
-        """保存配置到文件"""
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            self.config.write(f)
+        """立即保存配置到文件，先写临时文件再替换，写入中途崩溃不会留下不完整的配置文件"""
+        with self.lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            temp_file = f'{self.config_file}.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                self.config.write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.config_file)
+            self._dirty = False
+
+    def flush(self):
+        """有未写入的修改时立即保存"""
+        with self.lock:
+            if self._dirty:
+                self.save_config()
+
+    @contextmanager
+    def batch(self):
+        """批量修改配置：块内的修改在结束时只写一次文件；块内抛出异常时撤销块内的全部修改"""
+        with self.lock:
+            snapshot = {section: dict(self.config[section]) for section in self.config.sections()} if self._batch_depth == 0 else None
+            dirty = self._dirty
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                if snapshot is not None:
+                    for section in self.config.sections():
+                        self.config.remove_section(section)
+                    self.config.read_dict(snapshot)
+                    self._typed_cache.clear()
+                    self._dirty = dirty
+                raise
+            finally:
+                self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self.save_config()
+
+    def _mark_dirty(self):
+        """记录有未保存的修改，批量修改之外延迟 flush_delay 秒后在后台写入"""
+        self._dirty = True
+        if self._batch_depth:
+            return
+        if self._flush_timer:
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
     
     def _simple_encrypt(self, text: str) -> str:
         """简单的密码加密（Base64编码）"""
@@ -112,33 +172,71 @@ class ConfigManager:
             password: 密码
             save_password: 是否保存密码
         """
-        if '账号信息' not in self.config:
-            self.config.add_section('账号信息')
+        with self.lock:
+            if '账号信息' not in self.config:
+                self.config.add_section('账号信息')
 
-        self.config['账号信息']['userid'] = userid
+            self.config['账号信息']['userid'] = userid
 
-        # 只有在选择保存密码时才加密保存密码
-        if save_password:
-            self.config['账号信息']['password'] = self._simple_encrypt(password)
-        else:
-            self.config['账号信息']['password'] = ''
+            # 只有在选择保存密码时才加密保存密码
+            if save_password:
+                self.config['账号信息']['password'] = self._simple_encrypt(password)
+            else:
+                self.config['账号信息']['password'] = ''
 
-        self.config['账号信息']['save_password'] = str(save_password)
+            self.config['账号信息']['save_password'] = str(save_password)
 
-        self.save_config()
+            self._mark_dirty()
     
     def get_setting(self, section: str, key: str, default=None):
         """获取配置项"""
         if section in self.config and key in self.config[section]:
             return self.config[section][key]
         return default
-    
+
+    def get_int(self, section: str, key: str, default: int = 0) -> int:
+        """获取整数配置项，无法转换时返回默认值"""
+        return self._get_typed(section, key, int, default)
+
+    def get_float(self, section: str, key: str, default: float = 0.0) -> float:
+        """获取浮点数配置项，无法转换时返回默认值"""
+        return self._get_typed(section, key, float, default)
+
+    def get_bool(self, section: str, key: str, default: bool = False) -> bool:
+        """获取布尔配置项（True/False、yes/no、1/0、on/off）"""
+        return self._get_typed(section, key, bool, default)
+
+    def _get_typed(self, section, key, value_type, default):
+        cache_key = (section, key, value_type)
+        try:
+            return self._typed_cache[cache_key]
+        except KeyError:
+            pass
+        text = self.get_setting(section, key)
+        if text is None:
+            return default
+        try:
+            if value_type is bool:
+                value = self.config.BOOLEAN_STATES[text.strip().lower()]
+            else:
+                value = value_type(text)
+        except (KeyError, ValueError):
+            return default
+        self._typed_cache[cache_key] = value
+        return value
+
     def set_setting(self, section: str, key: str, value):
-        """设置配置项"""
-        if section not in self.config:
-            self.config.add_section(section)
-        self.config[section][key] = str(value)
-        self.save_config()
+        """设置配置项，值没有变化时不写入"""
+        value = str(value)
+        with self.lock:
+            if section not in self.config:
+                self.config.add_section(section)
+            elif self.config[section].get(key) == value:
+                return
+            self.config[section][key] = value
+            for value_type in (int, float, bool):
+                self._typed_cache.pop((section, key, value_type), None)
+            self._mark_dirty()
     
     def get_daily_settings(self):
         """获取日常设置"""
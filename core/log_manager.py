@@ -0,0 +1,71 @@
+# coding:utf-8
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+LOG_FORMAT = '%(asctime)s %(levelname)-7s [%(threadName)s] %(name)s: %(message)s'
+
+_listener = None
+
+
+def parse_level(level, default=logging.INFO):
+    """把 'DEBUG'、'info' 之类的级别名称转换为 logging 的级别数值，无法识别时返回 default"""
+    if isinstance(level, int):
+        return level
+    if isinstance(level, str):
+        value = logging.getLevelName(level.strip().upper())
+        if isinstance(value, int):
+            return value
+    return default
+
+
+def setup_logging(level='INFO', log_file=None, console=True):
+    """配置日志系统
+
+    各线程（接收、发送、日常任务）只把日志记录放入队列，由 QueueListener 的后台线程写控制台和文件，
+    不会因为控制台或磁盘 I/O 阻塞。重复调用只更新日志级别。
+    """
+    global _listener
+    if _listener is not None:
+        set_log_level(level)
+        return _listener
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if console:
+        handlers.append(logging.StreamHandler())
+    if log_file:
+        directory = os.path.dirname(log_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(log_file, maxBytes=2 * 1024 * 1024, backupCount=3, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    logging.getLogger().addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+    atexit.register(stop_logging)
+    set_log_level(level)
+    return _listener
+
+
+def set_log_level(level):
+    """运行时修改日志级别，低于该级别的日志在调用处就被丢弃"""
+    logging.getLogger().setLevel(parse_level(level))
+
+
+def configured_level(config_manager):
+    """配置中的日志级别，调试模式下为 DEBUG"""
+    if config_manager.get_bool('通用设置', 'debug_mode'):
+        return logging.DEBUG
+    return parse_level(config_manager.get_setting('通用设置', 'log_level', 'INFO'))
+
+
+def stop_logging():
+    """停止后台写日志的线程，队列中剩余的记录会先写完"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,11 +1,118 @@
-import hashlib
+import hashlib, logging, threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# 可选的加解密实现：reference 为逐字节的原始实现，bigint 为基于大整数的批量实现
+CIPHER_BACKENDS = ('reference', 'bigint')
+
 
 class Algorithms:
-    def __init__(self):
+    def __init__(self, backend='auto', cache_size=64):
         self.key = b'!crAckmE4nOthIng:-)'  # 初始化 key
         self.result = 0  # 初始化 result
+        self.backend = None
+        self.set_backend(backend)
+        # (key, 长度) -> (密钥流小端整数, 旋转字节数) 的 LRU 缓存
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._key_cache = OrderedDict()
+        self._key_cache_lock = threading.Lock()
+
+    def set_backend(self, backend):
+        """切换加解密实现，auto 时使用 bigint"""
+        if backend == 'auto':
+            backend = 'bigint'
+        if backend not in CIPHER_BACKENDS:
+            raise ValueError(f"Unknown cipher backend: {backend}")
+        self.backend = backend
 
     def encrypt(self, plain: bytes) -> bytes:
+        if self.backend == 'bigint':
+            return self._encrypt_bigint(plain)
+        return self._encrypt_reference(plain)
+
+    def decrypt(self, cipher: bytes) -> bytes:
+        if self.backend == 'bigint':
+            return self._decrypt_bigint(cipher)
+        return self._decrypt_reference(cipher)
+
+    def key_stream(self, length: int) -> bytes:
+        """展开长度为 length 的密钥流
+
+        原始实现中 j 走完一轮密钥后会在下标 0 停留两次，因此除第一轮外密钥流的周期为
+        key[0] + key，可以直接拼接得到，无需逐字节计算下标。
+        """
+        key = self.key
+        if length <= len(key):
+            return key[:length]
+        cycle = key[:1] + key
+        repeat = (length - len(key)) // len(cycle) + 1
+        return (key + cycle * repeat)[:length]
+
+    def key_schedule(self, length: int):
+        """获取长度为 length 的明文对应的 (密钥流小端整数, 旋转字节数)，按 (key, length) 做 LRU 缓存"""
+        cache_key = (self.key, length)
+        with self._key_cache_lock:
+            entry = self._key_cache.get(cache_key)
+            if entry is not None:
+                self._key_cache.move_to_end(cache_key)
+                self.cache_hits += 1
+                return entry
+            self.cache_misses += 1
+        # 加密和解密的旋转字节数相同：key[明文长度 % len(key)] * 13 % 密文长度
+        entry = (int.from_bytes(self.key_stream(length), byteorder = 'little'),
+                 self.key[length % len(self.key)] * 13 % (length + 1))
+        with self._key_cache_lock:
+            self._key_cache[cache_key] = entry
+            while len(self._key_cache) > self.cache_size:
+                self._key_cache.popitem(last = False)
+        return entry
+
+    def clear_key_cache(self):
+        """清空密钥流缓存"""
+        with self._key_cache_lock:
+            self._key_cache.clear()
+
+    def cache_info(self):
+        """返回密钥流缓存的命中统计"""
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'size': len(self._key_cache),
+            'maxsize': self.cache_size,
+        }
+
+    def _encrypt_bigint(self, plain: bytes) -> bytes:
+        body = plain[4:]  # 跳过前4个字节（封包长度）
+        length = len(body)
+        cipher_len = length + 1
+        stream, result = self.key_schedule(length)
+        # 异或：按小端整数整体异或，等价于逐字节异或
+        value = int.from_bytes(body, byteorder = 'little') ^ stream
+        # 位变换：cipher[i] = (cipher[i] << 5) | (cipher[i - 1] >> 3)，即小端整数整体左移5位，最低位补3
+        value = (value << 5) | 3
+        # 旋转：cipher[result:] + cipher[:result]，即小端整数循环右移 result 个字节
+        shift = result * 8
+        value = (value >> shift) | ((value & ((1 << shift) - 1)) << (cipher_len * 8 - shift))
+        return (cipher_len + 4).to_bytes(length = 4, byteorder = 'big') + value.to_bytes(cipher_len, byteorder = 'little')
+
+    def _decrypt_bigint(self, cipher: bytes) -> bytes:
+        plain_len = len(cipher) - 1  # 计算封包长度（密文长度比明文长度大一）
+        body = cipher[4:]  # 跳过前4个字节（封包长度）
+        cipher_len = len(body)
+        length = cipher_len - 1
+        stream, result = self.key_schedule(length)
+        # 旋转：cipher[-result:] + cipher[:-result]，按小端整数拼接，不产生中间 bytes
+        split = cipher_len - result
+        value = int.from_bytes(body[split:], byteorder = 'little') | (int.from_bytes(body[:split], byteorder = 'little') << (result * 8))
+        # 位还原：plain[i] = (cipher[i] >> 5) | (cipher[i + 1] << 3)，即小端整数整体右移5位
+        value = (value >> 5) & ((1 << (length * 8)) - 1)
+        value ^= stream
+        return plain_len.to_bytes(length = 4, byteorder = 'big') + value.to_bytes(length, byteorder = 'little')
+
+    def _encrypt_reference(self, plain: bytes) -> bytes:
         cipher_len = len(plain) + 1  # 计算封包长度（密文长度比明文长度大一）
         plain = plain[4:]  # 跳过前4个字节（封包长度）
         cipher = bytearray(len(plain) + 1)  # cipher 长度为 plain 长度 + 1
@@ -33,9 +140,9 @@ class Algorithms:
         # 返回拼接封包长度与加密后的数据
         return cipher_len.to_bytes(length = 4, byteorder = 'big') + bytes(cipher)
 
-    def decrypt(self, cipher: bytes) -> bytes:
+    def _decrypt_reference(self, cipher: bytes) -> bytes:
         plain_len = len(cipher) - 1  # 计算封包长度（密文长度比明文长度大一）
-        cipher = cipher[4:]  # 跳过前4个字节（封包长度）
+        cipher = bytes(cipher[4:])  # 跳过前4个字节（封包长度），分帧器传入的可能是 memoryview
         # 计算旋转索引
         result = self.key[(len(cipher) - 1) % len(self.key)] * 13 % len(cipher)
         # 进行数组旋转
@@ -75,7 +182,9 @@ class Algorithms:
         new_key = md5_hash[:10]
         # 更新新的通信密钥
         self.key = new_key.encode('utf-8')
-        print("Updated encryption key to:", self.key)
+        # 旧密钥的密钥流不会再被使用
+        self.clear_key_cache()
+        logger.debug("Updated encryption key to: %r", self.key)
 
     def MSerial(self, a, b, c, d):
         return a + c + int(a / -3) + (b % 17) + (d % 23) + 120
@@ -87,5 +196,5 @@ class Algorithms:
                 crc8_val ^= byte
         new_result = self.MSerial(self.result, len(body), crc8_val, cmdId)
         self.result = new_result
-        print("Updated result to:", new_result)
+        logger.debug("Updated result to: %d", new_result)
         return new_result
@@ -0,0 +1,114 @@
+import json, marshal, os, threading
+
+COMMAND_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Command.json')
+CACHE_PATH = os.path.join('cache', 'command_table.marshal')
+_CACHE_VERSION = 1
+
+
+class CommandTable:
+    """命令号与命令名称的对照表，以整数命令号为键，并提供名称到命令号的反向索引"""
+    __slots__ = ('names', 'display_names', 'ids')
+
+    def __init__(self, names, display_names=None, ids=None):
+        self.names = names  # 命令号 -> (名称, ...)，同一命令号可能有多个名称
+        if display_names is None:
+            display_names = {command_id: '/'.join(command_names) for command_id, command_names in names.items()}
+        self.display_names = display_names
+        if ids is None:
+            ids = {}
+            for command_id, command_names in names.items():
+                for name in command_names:
+                    ids.setdefault(name, command_id)
+        self.ids = ids
+
+    def dump(self):
+        return self.names, self.display_names, self.ids
+
+    def name(self, command_id, default='Unknown Command'):
+        """日志中显示的命令名称，多个名称以 / 分隔"""
+        return self.display_names.get(command_id, default)
+
+    def id(self, name):
+        """按名称查找命令号，找不到时抛出 KeyError"""
+        return self.ids[name]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, command_id):
+        return command_id in self.names
+
+
+def compile_command_table(json_path=COMMAND_JSON):
+    """读取 Command.json，返回 {命令号: (名称, ...)}"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {int(command_id): tuple(names) if isinstance(names, list) else (str(names),) for command_id, names in data.items()}
+
+
+def _load_cached(cache_path, stat):
+    try:
+        with open(cache_path, 'rb') as f:
+            version, mtime_ns, size, tables = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != _CACHE_VERSION or mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+        return None
+    return CommandTable(*tables)
+
+
+def _save_cached(cache_path, stat, table):
+    try:
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{cache_path}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(marshal.dumps((_CACHE_VERSION, stat.st_mtime_ns, stat.st_size, table.dump())))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # 缓存写不进去（如只读目录）不影响使用，下次启动再解析 JSON
+        pass
+
+
+def load_command_table(json_path=COMMAND_JSON, cache_path=CACHE_PATH):
+    """加载命令表，优先使用与 Command.json 修改时间、大小一致的预编译缓存"""
+    stat = os.stat(json_path)
+    table = _load_cached(cache_path, stat) if cache_path else None
+    if table is None:
+        table = CommandTable(compile_command_table(json_path))
+        if cache_path:
+            _save_cached(cache_path, stat, table)
+    return table
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_command_table():
+    """进程内共享的命令表，第一次调用时加载"""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = load_command_table()
+    return _table
+
+
+if __name__ == '__main__':
+    # 用法：python -m function.CommandTable
+    import tempfile, time
+    cache_path = os.path.join(tempfile.mkdtemp(), 'command_table.marshal')
+    load_command_table(cache_path = cache_path)
+    for name, run in (('json', lambda: CommandTable(compile_command_table())),
+                      ('cached', lambda: load_command_table(cache_path = cache_path))):
+        begin = time.perf_counter()
+        for _ in range(20):
+            table = run()
+        print(f"{name}: {len(table)} 条命令, {(time.perf_counter() - begin) * 50:.2f}ms")
+    table = get_command_table()
+    begin = time.perf_counter()
+    for _ in range(100000):
+        table.name(2503)
+    print(f"查找: {(time.perf_counter() - begin) * 10:.3f}us/次, 2503 -> {table.name(2503)}, NOTE_READY_TO_FIGHT -> {table.id('NOTE_READY_TO_FIGHT')}")
@@ -2,9 +2,16 @@ import sys
 from PySide6.QtWidgets import QApplication
 from qfluentwidgets import setTheme, Theme, setThemeColor
 
+from core.config_manager import config_manager
+from core.log_manager import configured_level, setup_logging
+from core.ServerSelector import get_server_selector
 from view.main_windows import Window
 
 if __name__ == '__main__':
+    setup_logging(configured_level(config_manager), log_file='logs/seer.log')
+    # 开启自动选择服务器时提前在后台探测延迟，登录时直接使用探测结果
+    if config_manager.get_bool('通用设置', 'auto_server'):
+        get_server_selector().warm()
     app = QApplication(sys.argv)
 
     # 设置主题色和浅色主题
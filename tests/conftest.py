@@ -0,0 +1,5 @@
+import os, sys
+
+# 测试从仓库根目录导入 core、function 等包；界面相关的测试不需要显示器
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
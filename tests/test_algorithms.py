@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from function.Algorithms import Algorithms
+
+KEYS = (b'!crAckmE4nOthIng:-)', b'0123456789', b'ab', b'a')
+LENGTHS = list(range(0, 80)) + [390 * 5 + 21, 4000]
+
+
+def make_plain(rng, length):
+    body = bytes(rng.getrandbits(8) for _ in range(length))
+    return (length + 4).to_bytes(4, byteorder = 'big') + body
+
+
+@pytest.mark.parametrize('key', KEYS)
+def test_bigint_matches_reference(key):
+    rng = random.Random(key)
+    reference, bigint = Algorithms('reference'), Algorithms('bigint')
+    reference.key = bigint.key = key
+    for length in LENGTHS:
+        for _ in range(3):
+            plain = make_plain(rng, length)
+            cipher = reference.encrypt(plain)
+            assert bigint.encrypt(plain) == cipher, (key, length)
+            assert reference.decrypt(cipher) == plain, (key, length)
+            assert bigint.decrypt(cipher) == plain, (key, length)
+
+
+@pytest.mark.parametrize('backend', ('reference', 'bigint'))
+@pytest.mark.parametrize('wrap', (bytearray, memoryview))
+def test_buffer_inputs(backend, wrap):
+    rng = random.Random(backend)
+    algorithms = Algorithms(backend)
+    expected = Algorithms('reference')
+    for length in (0, 1, 19, 20, 390):
+        plain = make_plain(rng, length)
+        cipher = expected.encrypt(plain)
+        assert bytes(algorithms.encrypt(wrap(bytearray(plain)))) == cipher
+        assert bytes(algorithms.decrypt(wrap(bytearray(cipher)))) == plain
+
+
+def test_key_schedule_cache_follows_key():
+    algorithms = Algorithms('bigint', cache_size = 2)
+    plain = make_plain(random.Random(1), 50)
+    first = algorithms.encrypt(plain)
+    algorithms.key = b'0123456789'
+    second = algorithms.encrypt(plain)
+    reference = Algorithms('reference')
+    reference.key = b'0123456789'
+    assert second == reference.encrypt(plain) != first
+    assert algorithms.cache_info()['misses'] == 2
@@ -0,0 +1,65 @@
+import os, time
+
+import pytest
+from PySide6.QtGui import QColor, QImage
+from PySide6.QtWidgets import QApplication
+
+from view.home_interface import BannerWidget, load_banner_image
+
+
+@pytest.fixture(scope = 'module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'bg.png')
+    image = QImage(400, 400, QImage.Format_RGB32)
+    image.fill(QColor(20, 120, 200))
+    image.save(path)
+    return path
+
+
+def cached_files(cache_dir):
+    return sorted(os.listdir(cache_dir))
+
+
+def test_only_the_latest_size_is_kept(source, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    image = load_banner_image(source, 200, 100, cache_dir)
+    assert (image.width(), image.height()) == (200, 100)
+    first = cached_files(cache_dir)
+    assert len(first) == 1 and first[0].endswith('-200x100.bmp')
+    load_banner_image(source, 300, 120, cache_dir)
+    assert [name[-11:] for name in cached_files(cache_dir)] == ['300x120.bmp']
+
+
+def test_cache_is_keyed_on_file_stat(source, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    load_banner_image(source, 200, 100, cache_dir)
+    name = cached_files(cache_dir)
+    # 命中缓存时不改写文件
+    load_banner_image(source, 200, 100, cache_dir)
+    assert cached_files(cache_dir) == name
+    # 原图修改后重新生成，旧缓存被删除
+    stat = os.stat(source)
+    os.utime(source, ns = (stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    load_banner_image(source, 200, 100, cache_dir)
+    assert len(cached_files(cache_dir)) == 1 and cached_files(cache_dir) != name
+
+
+def test_banner_widget_loads_in_background(app, source, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    widget = BannerWidget()
+    widget.imagePath = source
+    widget.resize(320, 448)
+    widget.show()
+    deadline = time.monotonic() + 5
+    while widget.banner is None:
+        assert time.monotonic() < deadline
+        app.processEvents()
+        time.sleep(0.01)
+    ratio = widget.devicePixelRatioF()
+    assert (widget.bannerSize.width(), widget.bannerSize.height()) == (round(widget.width() * ratio), round(widget.height() * ratio))
+    widget.close()
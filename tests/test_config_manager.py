@@ -0,0 +1,66 @@
+import configparser, time
+
+import pytest
+
+from core.config_manager import ConfigManager
+
+
+def read_file(path):
+    config = configparser.ConfigParser()
+    config.read(path, encoding = 'utf-8')
+    return config
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ConfigManager(str(tmp_path / 'config.ini'), flush_delay = 0.05)
+    yield manager
+    manager.flush()
+
+
+def test_changes_are_debounced_into_one_write(manager, monkeypatch):
+    writes = []
+    save_config = manager.save_config
+    monkeypatch.setattr(manager, 'save_config', lambda: (writes.append(1), save_config()))
+    for value in range(5):
+        manager.set_setting('通用设置', 'max_retry', value)
+    assert writes == [] and read_file(manager.config_file)['通用设置']['max_retry'] == '3'
+    deadline = time.monotonic() + 2
+    while manager._dirty:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert writes == [1]
+    assert read_file(manager.config_file)['通用设置']['max_retry'] == '4'
+
+
+def test_unchanged_value_is_not_written(manager):
+    manager.set_setting('通用设置', 'server', 32)
+    assert not manager._dirty and manager._flush_timer is None
+
+
+def test_batch_writes_once_at_the_end(manager):
+    with manager.batch():
+        manager.set_setting('通用设置', 'server', 5)
+        manager.set_setting('日常设置', 'a', '启用')
+        assert read_file(manager.config_file)['通用设置']['server'] == '32'
+    config = read_file(manager.config_file)
+    assert config['通用设置']['server'] == '5' and config['日常设置']['a'] == '启用'
+    assert not manager._dirty
+
+
+def test_batch_rolls_back_on_exception(manager):
+    assert manager.get_int('通用设置', 'server') == 32
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.set_setting('通用设置', 'server', 5)
+            manager.set_setting('新设置', 'key', 'value')
+            with manager.batch():
+                manager.set_setting('日常设置', 'a', '启用')
+            raise RuntimeError('中途失败')
+    # 内层批量修改也一起撤销，类型转换的缓存不保留块内的值
+    assert manager.get_int('通用设置', 'server') == 32
+    assert manager.get_setting('日常设置', 'a') == '禁止'
+    assert '新设置' not in manager.config
+    assert not manager._dirty
+    assert read_file(manager.config_file)['通用设置']['server'] == '32'
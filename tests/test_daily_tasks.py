@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from core.AsyncTransport import AsyncGameConnection
+from core.config_manager import config_manager
+
+
+class FakeManager:
+    def __init__(self, team_ready):
+        self.team_ready = team_ready
+        self.calls = []
+
+    async def prepare_team(self, team):
+        self.calls.append(('prepare_team', team))
+        return self.team_ready
+
+    def __getattr__(self, name):
+        async def task():
+            self.calls.append(name)
+        return task
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    async def no_sleep(seconds):
+        pass
+    monkeypatch.setattr(asyncio, 'sleep', no_sleep)
+    # 只启用 VIP礼包、勇者之塔、泰坦矿洞
+    monkeypatch.setattr(config_manager, 'get_daily_settings',
+                        lambda: {key: '启用' if key in ('b', 'g', 'h') else '禁止' for key in 'abcdefghijkl'} | {'daily_check_in': '禁止'})
+    return AsyncGameConnection(1001, log_level = 'INFO')
+
+
+def test_team_is_prepared_once_before_battle_tasks(connection):
+    connection.pet_fight_packet_manager = manager = FakeManager(True)
+    detail = asyncio.run(connection.execute_daily_tasks())
+    assert manager.calls == ['vip_package', ('prepare_team', '84'), 'brave_tower', 'titan_mines']
+    assert '×' not in detail
+
+
+def test_battle_tasks_are_skipped_when_team_is_not_ready(connection):
+    connection.pet_fight_packet_manager = manager = FakeManager(False)
+    detail = asyncio.run(connection.execute_daily_tasks())
+    assert manager.calls == ['vip_package', ('prepare_team', '84')]
+    assert detail.splitlines() == ['VIP礼包：√', '出战精灵：× (背包精灵未就位)', '勇者之塔：× (出战精灵未就位)', '泰坦矿洞：× (出战精灵未就位)']
@@ -0,0 +1,81 @@
+import asyncio, threading, time
+
+from core.PacingEngine import PacingEngine, FIGHT_OVER, NOTE_START_FIGHT
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def dispatch(self, command_id):
+        for listener in self.listeners:
+            listener(command_id, b'')
+
+
+def make_engine(**kwargs):
+    dispatcher = FakeDispatcher()
+    return PacingEngine(dispatcher, **kwargs), dispatcher
+
+
+def test_ack_completes_wait_early():
+    engine, dispatcher = make_engine(ack_timeout = 2, min_interval = 0.01)
+    token = engine.before_send(2404)
+    assert token.ack is not None
+    threading.Timer(0.05, dispatcher.dispatch, (NOTE_START_FIGHT,)).start()
+    begin = time.monotonic()
+    engine.wait(token, 1)
+    assert time.monotonic() - begin < 0.5
+    assert token.ack.result() == NOTE_START_FIGHT
+    assert engine.in_fight is True and engine._ack_waiters == []
+
+
+def test_ack_completes_async_wait():
+    engine, dispatcher = make_engine(ack_timeout = 2, min_interval = 0.01)
+
+    async def main():
+        token = engine.before_send(2405)
+        asyncio.get_running_loop().call_later(0.05, dispatcher.dispatch, 2505)
+        begin = time.monotonic()
+        await engine.wait_async(token, 1)
+        return time.monotonic() - begin, token
+
+    elapsed, token = asyncio.run(main())
+    assert elapsed < 0.5 and token.ack.result() == 2505
+
+
+def test_missing_ack_is_dropped_after_timeout():
+    engine, dispatcher = make_engine(ack_timeout = 0.1, min_interval = 0.01)
+    token = engine.before_send(2415)
+    begin = time.monotonic()
+    engine.wait(token, 5)
+    # 等到确认超时即继续，不按流程给出的等待时间
+    assert 0.1 <= time.monotonic() - begin < 1
+    assert engine._ack_waiters == []
+    # 超时之后到达的确认不影响之后的发送
+    dispatcher.dispatch(2503)
+    assert not token.ack.done()
+
+
+def test_fight_commands_skip_ack_after_fight_over():
+    engine, dispatcher = make_engine(min_interval = 0.01)
+    dispatcher.dispatch(FIGHT_OVER)
+    assert engine.in_fight is False
+    # 战斗已结束，技能和逃跑不会再有确认
+    assert engine.before_send(2405).ack is None
+    assert engine.before_send(2410).ack is None
+    # 进入战斗的命令不受影响
+    assert engine.before_send(2404).ack is not None
+    dispatcher.dispatch(NOTE_START_FIGHT)
+    assert engine.before_send(2405).ack is not None
+
+
+def test_learned_latency_shortens_interval():
+    engine, dispatcher = make_engine(min_interval = 0.01, latency_factor = 2)
+    token = engine.before_send(4101)
+    assert token.ack is None and engine.interval(token, 0.3) == 0.3
+    time.sleep(0.02)
+    dispatcher.dispatch(4101)
+    assert 0.02 <= engine.interval(token, 0.3) < 0.3
@@ -0,0 +1,64 @@
+import pytest
+
+from core.PacketFramer import PacketFramer, ReplaySocket
+
+
+def frame(body):
+    return (len(body) + 4).to_bytes(4, byteorder = 'big') + body
+
+
+def collect(framer):
+    return [bytes(packet) for packet in framer.frames()]
+
+
+def test_merged_frames_are_split():
+    framer = PacketFramer()
+    packets = [frame(b'a' * 13), frame(b'bb' * 20), frame(b'c')]
+    framer.feed(b''.join(packets))
+    assert collect(framer) == packets
+    assert framer.pending() == 0 and framer.start == framer.end == 0
+
+
+def test_split_frame_waits_for_the_rest():
+    framer = PacketFramer()
+    packet = frame(bytes(range(60)))
+    # 长度字段本身也可能被拆开
+    for chunk in (packet[:2], packet[2:10]):
+        framer.feed(chunk)
+        assert collect(framer) == []
+    framer.feed(packet[10:])
+    assert collect(framer) == [packet]
+
+
+def test_frames_across_reads_and_buffer_wrap():
+    packets = [frame(bytes([i % 256]) * (i % 50 + 1)) for i in range(500)]
+    data = b''.join(packets)
+    framer = PacketFramer(read_size = 64, capacity = 256)
+    tcp_socket = ReplaySocket(data, chunk_size = 37)
+    received = []
+    while framer.fill(tcp_socket):
+        received.extend(collect(framer))
+    assert received == packets
+    # 缓冲区只在单个封包放不下时扩容
+    assert len(framer.buffer) == 256
+
+
+def test_oversized_frame_grows_the_buffer():
+    packet = frame(bytes(1000))
+    framer = PacketFramer(read_size = 64, capacity = 128)
+    tcp_socket = ReplaySocket(packet + frame(b'x'), chunk_size = 64)
+    received = []
+    while framer.fill(tcp_socket):
+        received.extend(collect(framer))
+    assert received == [packet, frame(b'x')]
+    assert len(framer.buffer) >= len(packet)
+
+
+@pytest.mark.parametrize('length', [0, 4])
+def test_bad_length_is_rejected(length):
+    framer = PacketFramer()
+    framer.feed(frame(b'ok') + length.to_bytes(4, byteorder = 'big') + bytes(8))
+    frames = framer.frames()
+    assert bytes(next(frames)) == frame(b'ok')
+    with pytest.raises(ValueError):
+        next(frames)
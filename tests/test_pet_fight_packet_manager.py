@@ -0,0 +1,116 @@
+import json, struct
+
+import pytest
+
+from core.PetFightPacketManager import PetFightPacketManager, Send, Request, MOVE_PET
+from core.PetParser import PET_RECORD_SIZE, CATCH_TIME_OFFSET
+from core.PetTimestampCache import PetTimestampCache
+
+
+def warehouse_packet(records):
+    body = struct.pack('>I', len(records)) + b''.join(struct.pack('>II', *record) for record in records)
+    return bytes(17) + body
+
+
+def bag_packet(records):
+    body = struct.pack('>I', len(records))
+    for pet_id, catch_time in records:
+        record = bytearray(PET_RECORD_SIZE)
+        struct.pack_into('>I', record, 0, pet_id)
+        struct.pack_into('>I', record, CATCH_TIME_OFFSET, catch_time)
+        body += bytes(record)
+    return bytes(17) + body
+
+
+def run(manager, name, *args, responses=None):
+    """执行流程，按命令号回答 Request，返回 (流程返回值, 发出的封包, 请求的命令号)"""
+    steps = manager.steps(name, *args)
+    sent, requested = [], []
+    value = None
+    while True:
+        try:
+            step = steps.send(value)
+        except StopIteration as stop:
+            return stop.value, sent, requested
+        value = None
+        if isinstance(step, Send):
+            sent.append(step.packet)
+        elif isinstance(step, Request):
+            requested.append(step.command_id)
+            value = responses[step.command_id].pop(0)
+
+
+def moved(sent):
+    """MOVE_PET 封包的 (捕获时间戳, 方向)"""
+    return [(packet.body[:4].hex().upper(), packet.body[7]) for packet in sent if packet.command_id == MOVE_PET.command_id]
+
+
+def test_known_pets_skip_warehouse_and_missing_ids_are_reported():
+    manager = PetFightPacketManager(None, None, pacing = False)
+    manager.pet_timestamps = {3512: '61000001'}
+    result, sent, requested = run(manager, 'check_warehouse_pets', (3512, 3437, 3045, 9999),
+                                  responses = {45543: [warehouse_packet([(3045, 0x61000003), (3437, 0x61000002)])],
+                                               43706: [bag_packet([(3512, 0x61000001), (3437, 0x61000002), (3045, 0x61000003)])]})
+    # 只为未知的精灵获取一次仓库列表，已知的精灵直接放入，按出战顺序，之后检查背包
+    assert requested == [45543, 43706]
+    assert moved(sent) == [('61000001', 1), ('61000002', 1), ('61000003', 1)]
+    assert result == [9999]
+
+
+def test_all_known_pets_do_not_fetch_warehouse():
+    manager = PetFightPacketManager(None, None, pacing = False)
+    manager.pet_timestamps = {3512: '61000001', 3437: '61000002'}
+    result, sent, requested = run(manager, 'check_warehouse_pets', (3437, 3512),
+                                  responses = {43706: [bag_packet([(3437, 0x61000002), (3512, 0x61000001)])]})
+    assert requested == [43706] and result == []
+    assert moved(sent) == [('61000002', 1), ('61000001', 1)]
+
+
+def test_stale_cached_timestamp_falls_back_to_warehouse(tmp_path):
+    cache = PetTimestampCache(str(tmp_path / 'pets.json'))
+    cache.update({3512: '61000001', 3437: '0BADBEEF'})
+    manager = PetFightPacketManager(None, None, pacing = False, timestamp_cache = cache)
+    result, sent, requested = run(manager, 'check_warehouse_pets', (3512, 3437, 3045), responses = {
+        45543: [warehouse_packet([(3045, 0x61000003)]), warehouse_packet([(3437, 0x61000002)])],
+        # 3437 的缓存时间戳已失效，没有放入背包
+        43706: [bag_packet([(3512, 0x61000001), (3045, 0x61000003)])],
+    })
+    assert result == [] and requested == [45543, 43706, 45543]
+    assert moved(sent) == [('61000001', 1), ('0BADBEEF', 1), ('61000003', 1),
+                           # 3437 之后的精灵放回仓库，再按顺序重新放入
+                           ('61000003', 0), ('61000002', 1), ('61000003', 1)]
+    assert json.loads((tmp_path / 'pets.json').read_text())['3437'] == '61000002'
+
+
+def test_failed_cache_write_keeps_pending_entries(tmp_path, monkeypatch):
+    cache = PetTimestampCache(str(tmp_path / 'pets.json'))
+    cache.update({3512: '61000001'})
+    def fail(*args):
+        raise OSError('disk full')
+    monkeypatch.setattr('os.replace', fail)
+    with pytest.raises(OSError):
+        cache.save()
+    assert cache.dirty
+    monkeypatch.undo()
+    cache.save()
+    assert not cache.dirty and PetTimestampCache(cache.path).get(3512) == '61000001'
+
+
+def test_prepare_team_reports_success():
+    manager = PetFightPacketManager(None, None, pacing = False)
+    bag = bag_packet([(3512, 0x61000001), (3437, 0x61000002), (3045, 0x61000003)])
+    assert run(manager, 'prepare_team', '84', responses = {43706: [bag]})[0] is True
+    # 背包列表超时
+    assert run(manager, 'prepare_team', '84', responses = {43706: [None]})[0] is False
+
+
+def test_malformed_cached_timestamps_are_dropped(tmp_path):
+    path = tmp_path / 'pets.json'
+    path.write_text(json.dumps({'3512': '61000001', '3437': 'abcdef01', '3045': '6100', '2000': 1627390209,
+                                '1000': '61000001 OR 1', 'x': '61000002'}))
+    cache = PetTimestampCache(str(path))
+    assert cache.snapshot() == {3512: '61000001', 3437: 'ABCDEF01'}
+    # 无效的条目在下次保存时从文件中移除
+    assert cache.dirty
+    cache.save()
+    assert json.loads(path.read_text()) == {'3437': 'ABCDEF01', '3512': '61000001'}
@@ -0,0 +1,116 @@
+import threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice
+from PySide6.QtGui import QColor, QGuiApplication, QImage
+
+from component.PetImageLoader import PetImageLoader
+
+
+@pytest.fixture(scope = 'module')
+def app():
+    return QGuiApplication.instance() or QGuiApplication([])
+
+
+@pytest.fixture
+def server():
+    """本地头像服务器，记录每次请求的路径，响应前等待 0.2 秒，让并发请求有机会合并"""
+    image = QImage(120, 60, QImage.Format_ARGB32)
+    image.fill(QColor(200, 30, 30))
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, 'PNG')
+    png = bytes(data)
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            time.sleep(0.2)
+            if self.path.startswith('/404'):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(png)))
+            self.end_headers()
+            self.wfile.write(png)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target = httpd.serve_forever, daemon = True).start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}/', requests
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def wait_until(app, condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "等待超时"
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def make_loader(server, tmp_path, **kwargs):
+    base_url, _ = server
+    loader = PetImageLoader(base_url = base_url, cache_dir = str(tmp_path), **kwargs)
+    ready = []
+    loader.imageReady.connect(lambda pet_id, size, image: ready.append((pet_id, size, image.width(), image.height())))
+    return loader, ready
+
+
+def test_concurrent_requests_share_one_download(app, server, tmp_path):
+    loader, ready = make_loader(server, tmp_path)
+    assert loader.request('3512', 40) is None
+    assert loader.request('3512', 80) is None
+    wait_until(app, lambda: len(ready) == 2)
+    assert server[1] == ['/3512.png']
+    assert sorted(ready) == [('3512', 40, 40, 20), ('3512', 80, 80, 40)]
+    # 之后的请求直接从内存返回
+    assert loader.request('3512', 80).width() == 80
+    assert (tmp_path / '3512.png').exists()
+    loader.shutdown()
+
+
+def test_disk_cache_avoids_download(app, server, tmp_path):
+    loader, ready = make_loader(server, tmp_path)
+    loader.request('3437', 40)
+    wait_until(app, lambda: ready)
+    loader.shutdown()
+
+    loader, ready = make_loader(server, tmp_path)
+    loader.request('3437', 60)
+    wait_until(app, lambda: ready)
+    assert server[1] == ['/3437.png']
+    loader.shutdown()
+
+
+def test_memory_cache_evicts_least_recently_used(app, server, tmp_path):
+    loader, ready = make_loader(server, tmp_path, memory_capacity = 2)
+    for size in (20, 30, 40):
+        loader.request('3045', size)
+        wait_until(app, lambda: len(ready) == (20, 30, 40).index(size) + 1)
+    assert list(loader.memory) == [('3045', 30), ('3045', 40)]
+    assert loader.cached('3045', 20) is None
+    # 访问过的条目移到末尾，下一次淘汰另一条
+    loader.cached('3045', 30)
+    assert list(loader.memory) == [('3045', 40), ('3045', 30)]
+    loader.shutdown()
+
+
+def test_failed_download_clears_pending(app, server, tmp_path):
+    base_url, requests = server
+    loader, ready = make_loader((base_url + '404/', requests), tmp_path)
+    loader.request('3512', 40)
+    wait_until(app, lambda: not loader.pending)
+    app.processEvents()
+    assert ready == [] and loader.memory == {}
+    # 精灵ID 同时用作文件名，非数字的ID不会发出请求
+    loader.request('../x', 40)
+    wait_until(app, lambda: not loader.pending)
+    assert requests == ['/404/3512.png']
+    loader.shutdown()
@@ -0,0 +1,44 @@
+import struct
+
+from core.PetParser import index_warehouse, iter_bag, parse_warehouse, PET_RECORD_SIZE, CATCH_TIME_OFFSET
+
+
+def warehouse_body(records, count=None, stride=8, tail=b''):
+    body = struct.pack('>I', len(records) if count is None else count)
+    for pet_id, catch_time in records:
+        body += struct.pack('>II', pet_id, catch_time) + bytes(stride - 8)
+    return body + tail
+
+
+RECORDS = [(3001, 0x61000001), (3002, 0x61000002), (3001, 0x61000003), (3004, 0x61000004)]
+
+
+def test_parse_warehouse_groups_timestamps():
+    assert parse_warehouse(warehouse_body(RECORDS, stride = 12)) == {
+        3001: [0x61000001, 0x61000003], 3002: [0x61000002], 3004: [0x61000004]}
+
+
+def test_wrong_stride_is_rejected():
+    # 数量字段与实际记录不符：推算的记录长度 16 能整除，但切分出的第二条记录全为 0
+    body = warehouse_body(RECORDS[:2], count = 2, tail = bytes(16))
+    assert parse_warehouse(body) is None
+    assert index_warehouse(body, [3002]) == {3002: [0x61000002]}
+
+
+def test_missing_ids_fall_back_to_scan():
+    # 推算的记录长度 16 恰好整除且通过校验，但跳过了第 2、4 条记录
+    body = warehouse_body(RECORDS, count = 2)
+    assert 3002 not in parse_warehouse(body)
+    index = index_warehouse(body, [3002, 3004, 9999])
+    assert index[3002] == [0x61000002] and index[3004] == [0x61000004]
+    assert 9999 not in index
+
+
+def test_iter_bag_ignores_incomplete_records():
+    record = bytearray(PET_RECORD_SIZE)
+    struct.pack_into('>I', record, 0, 3001)
+    struct.pack_into('>I', record, CATCH_TIME_OFFSET, 0x61000001)
+    body = struct.pack('>I', 2) + bytes(record) + bytes(10)
+    pets = list(iter_bag(body))
+    assert [(pet.pet_id, pet.catch_time) for pet in pets] == [(3001, 0x61000001)]
+    assert pets[0].catch_time_bytes == bytes.fromhex('61000001')
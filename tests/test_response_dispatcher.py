@@ -0,0 +1,27 @@
+from core.ResponseDispatcher import ResponseDispatcher
+
+
+def test_waiters_take_responses_in_order():
+    dispatcher = ResponseDispatcher()
+    first, second = dispatcher.expect(2503), dispatcher.expect(2503)
+    assert dispatcher.dispatch(2503, b'a') and dispatcher.dispatch(2503, b'b')
+    assert (first.result(0), second.result(0)) == (b'a', b'b')
+
+
+def test_predicate_and_unclaimed_responses():
+    dispatcher = ResponseDispatcher()
+    future = dispatcher.expect(45543, lambda packet_data: packet_data.startswith(b'ok'))
+    assert not dispatcher.dispatch(45543, b'other')
+    assert not dispatcher.dispatch(2414, b'unrelated')
+    assert dispatcher.dispatch(45543, b'ok') and future.result(0) == b'ok'
+    # 没有等待者时响应不会保留
+    assert dispatcher.wait(2414, timeout = 0.01) is None
+    assert dispatcher.pending_count() == 0
+
+
+def test_cancel_all_wakes_waiters():
+    dispatcher = ResponseDispatcher()
+    future = dispatcher.expect(1001)
+    dispatcher.cancel_all()
+    assert future.cancelled()
+    assert dispatcher.wait(1001, timeout = 0.01, future = future) is None
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from core.SendPipeline import SendPipeline
+
+
+class FakeTransport:
+    def __init__(self):
+        self.writes = []
+        self.closing = False
+
+    def write(self, data):
+        self.writes.append(data)
+
+    def is_closing(self):
+        return self.closing
+
+
+def test_packets_of_one_tick_are_written_once():
+    async def main():
+        transport = FakeTransport()
+        pipeline = SendPipeline(transport)
+        for data in (b'a', b'bb', b'ccc'):
+            pipeline.send(data)
+        assert transport.writes == [] and pipeline.queue_depth() == 3
+        await asyncio.sleep(0)
+        pipeline.send(b'd')
+        await asyncio.sleep(0)
+        return transport, pipeline
+
+    transport, pipeline = asyncio.run(main())
+    assert transport.writes == [b'abbccc', b'd']
+    assert pipeline.stats() == {'packets': 4, 'writes': 2, 'bytes': 7, 'bytes_per_write': 3.5, 'max_depth': 3, 'queue_depth': 0}
+
+
+def test_large_batches_are_written_immediately():
+    async def main():
+        transport = FakeTransport()
+        pipeline = SendPipeline(transport, max_batch_bytes = 4)
+        pipeline.send(b'aa')
+        pipeline.send(b'bb')
+        # 达到 max_batch_bytes，不等本轮结束
+        assert transport.writes == [b'aabb']
+        pipeline.send(b'c')
+        await asyncio.sleep(0)
+        return transport
+
+    assert asyncio.run(main()).writes == [b'aabb', b'c']
+
+
+def test_closed_transport_rejects_packets():
+    async def main():
+        transport = FakeTransport()
+        pipeline = SendPipeline(transport)
+        pipeline.send(b'a')
+        transport.closing = True
+        await asyncio.sleep(0)
+        assert transport.writes == []
+        with pytest.raises(ConnectionError):
+            pipeline.send(b'b')
+
+    asyncio.run(main())
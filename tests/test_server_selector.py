@@ -0,0 +1,62 @@
+import socket, time
+
+import pytest
+
+import core.ServerSelector as server_selector
+from core.ServerSelector import ServerSelector, configured_server
+
+
+@pytest.fixture
+def addresses():
+    """两个本地监听的服务器和一个无法连接的端口"""
+    listeners = []
+    for _ in range(2):
+        listener = socket.create_server(('127.0.0.1', 0))
+        listeners.append(listener)
+    closed = socket.create_server(('127.0.0.1', 0))
+    closed_address = closed.getsockname()
+    closed.close()
+    yield {1: listeners[0].getsockname(), 2: closed_address, 3: listeners[1].getsockname()}
+    for listener in listeners:
+        listener.close()
+
+
+def test_ranking_skips_unreachable_servers(addresses):
+    selector = ServerSelector(addresses, top_k = 2, timeout = 0.5, attempts = 1)
+    assert sorted(selector.ranking()) == [1, 3]
+    assert selector.latencies[2] is None
+    assert selector.best() in (1, 3)
+    # 在最快的两个服务器之间轮流分配
+    assert sorted(selector.pick() for _ in range(4)) == [1, 1, 3, 3]
+
+
+def test_all_unreachable_falls_back_to_default(addresses):
+    selector = ServerSelector({2: addresses[2]}, timeout = 0.5, attempts = 1, default = 7)
+    assert selector.ranking() == []
+    assert selector.best() == 7 and selector.pick() == 7
+
+
+def test_cached_ranking_probes_in_background(addresses):
+    selector = ServerSelector(addresses, timeout = 0.5, attempts = 1)
+    assert selector.cached_ranking() is None
+    deadline = time.monotonic() + 5
+    while selector.cached_ranking() is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert sorted(selector.cached_ranking()) == [1, 3]
+
+
+def test_configured_server_reports_fallback(addresses, monkeypatch):
+    monkeypatch.setattr(server_selector.config_manager, 'get_bool', lambda section, key, default=False: key == 'auto_server')
+    monkeypatch.setattr(server_selector.config_manager, 'get_int', lambda section, key, default=0: 32)
+    selector = ServerSelector({2: addresses[2]}, timeout = 0.5, attempts = 1)
+    monkeypatch.setattr(server_selector, '_selector', selector)
+    messages = []
+    # 还没有探测结果时不等待，直接使用设置的服务器
+    assert configured_server(messages.append) == 32
+    selector.ranking()
+    assert configured_server(messages.append) == 32
+    selector.addresses = addresses
+    selector.ranking(refresh = True)
+    assert configured_server(messages.append) in (1, 3)
+    assert [message.split('|')[1] for message in messages] == ['自动选择未完成', '自动选择失败', '自动选择']
@@ -0,0 +1,13 @@
+import os, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_startup_does_not_import_network_modules():
+    # 在新进程中导入程序入口和主窗口，requests 和 asyncio 连接只在第一次登录时导入
+    code = ("import sys, main, view.main_windows; "
+            "print(' '.join(name for name in ('requests', 'core.AsyncTransport') if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], cwd = ROOT, capture_output = True, text = True,
+                            env = dict(os.environ, QT_QPA_PLATFORM = 'offscreen'))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-1].strip() == ''
@@ -1,3 +1,4 @@
+import logging
 import time
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QStackedWidget
 from PySide6.QtCore import QThread, Signal, Qt
@@ -6,8 +7,11 @@ from qfluentwidgets import (CardWidget, BodyLabel, StrongBodyLabel,
                            VBoxLayout, SegmentedWidget, SpinBox,
                            SwitchButton, ScrollArea, FluentIcon, IndeterminateProgressBar)
 from core.client import webSocketClient
+from core.DailyTasks import BATTLE_TASKS, BATTLE_TEAM, DAILY_TASKS
 from core.config_manager import config_manager
 
+logger = logging.getLogger(__name__)
+
 
 class DailyTaskThread(QThread):
     """日常任务执行线程"""
@@ -30,34 +34,39 @@ class DailyTaskThread(QThread):
         total_tasks = len(self.selected_tasks)
         completed_tasks = 0
 
-        # 定义需要宠物检查的战斗任务
-        battle_tasks = {
-            'g', 'h', 'i', 'j', 'k', 'e', 'f'  # 勇者之塔、泰坦矿洞、泰坦源脉、精灵王试炼、X战队密室、经验战场、学习力战场
-        }
-
         # 检查选中的任务中是否包含战斗任务
         selected_task_keys = {task_key for task_key, _, _ in self.selected_tasks}
-        has_battle_tasks = bool(selected_task_keys & battle_tasks)
+        has_battle_tasks = bool(selected_task_keys & BATTLE_TASKS)
 
-        # 如果包含战斗任务，在开始前进行一次宠物检查
+        # 如果包含战斗任务，在开始前进行一次宠物检查，出战精灵没有就位时不执行战斗任务
+        team_ready = True
         if has_battle_tasks and hasattr(self.main_instance, 'pet_fight_packet_manager') and self.main_instance.pet_fight_packet_manager:
-            pet_ids_needed = (3512, 3437, 3045)  # 需要的精灵ID
             if self.main_instance.pet_fight_packet_manager.message_callback:
                 self.main_instance.pet_fight_packet_manager.message_callback("检测到战斗任务|开始前检查宠物")
-            self.main_instance.pet_fight_packet_manager.check_backpack_pets(pet_ids_needed)
+            try:
+                team_ready = webSocketClient.run_task(self.main_instance.pet_fight_packet_manager.prepare_team, BATTLE_TEAM)
+            except Exception as e:
+                logger.error("出战精灵准备失败: %s", e)
+                team_ready = False
             time.sleep(0.3)  # 检查后稍作延迟
 
         for task_key, task_name, task_function in self.selected_tasks:
+            if self.isInterruptionRequested():
+                return
             self.taskStarted.emit(task_name)
 
             try:
-                if hasattr(self.main_instance, 'pet_fight_packet_manager') and self.main_instance.pet_fight_packet_manager:
-                    task_function()
+                if task_key in BATTLE_TASKS and not team_ready:
+                    logger.warning("出战精灵未就位，跳过任务 %s", task_name)
+                    self.taskCompleted.emit(task_name, False)
+                elif hasattr(self.main_instance, 'pet_fight_packet_manager') and self.main_instance.pet_fight_packet_manager:
+                    # 流程在共享的事件循环中执行，本线程只等待结果
+                    webSocketClient.run_task(task_function)
                     self.taskCompleted.emit(task_name, True)
                 else:
                     self.taskCompleted.emit(task_name, False)
             except Exception as e:
-                print(f"任务 {task_name} 执行失败: {e}")
+                logger.error("任务 %s 执行失败: %s", task_name, e)
                 self.taskCompleted.emit(task_name, False)
 
             completed_tasks += 1
@@ -69,6 +78,11 @@ class DailyTaskThread(QThread):
 
         self.allTasksCompleted.emit()
 
+    def stop(self):
+        """请求停止：取消正在执行的任务，不再开始后续任务"""
+        self.requestInterruption()
+        webSocketClient.cancel_tasks()
+
 
 class DailyInterface(ScrollArea):
     def __init__(self, parent=None):
@@ -224,22 +238,8 @@ class DailyInterface(ScrollArea):
 
     def createTaskList(self, parent_layout):
         """创建任务列表"""
-        # 定义所有可用的日常任务 (任务键, 任务名, 函数名) - 参考core/main.py的实际函数映射
-        self.available_tasks = [
-            ('daily_check_in', '日常签到', 'daily_props_collection'),
-            ('a', '刻印抽奖', 'engraved_raffle_machine'),
-            ('b', 'VIP礼包', 'vip_package'),
-            ('c', '战队日常', 'team_contribution'),
-            ('d', '六界神王殿', None),  # 暂时没有实现
-            ('e', '经验战场', 'experience_training_ground'),
-            ('f', '学习力战场', 'learning_training_ground'),
-            ('g', '勇者之塔', 'brave_tower'),
-            ('h', '泰坦矿洞', 'titan_mines'),
-            ('i', '泰坦源脉', 'titan_vein'),
-            ('j', '精灵王试炼', 'trial_of_the_elf_king'),
-            ('k', 'X战队密室', 'x_team_chamber'),
-            ('l', '星愿漂流瓶许愿', 'make_a_wish'),
-        ]
+        # 所有可用的日常任务 (任务键, 任务名, 函数名)，与无界面执行使用同一张表
+        self.available_tasks = list(DAILY_TASKS)
 
         # 添加任务卡片到垂直布局，一行一行排列
         for task_key, task_name, _ in self.available_tasks:
@@ -454,14 +454,15 @@ class DailyInterface(ScrollArea):
     def saveDailySettings(self):
         """保存日常设置"""
         try:
-            # 保存开关状态，使用"启用"/"禁止"格式
-            for task_key, switch in self.task_switches.items():
-                # 永久禁用的任务始终保存为禁止状态
-                if task_key in self.permanently_disabled_tasks:
-                    config_manager.set_setting('日常设置', task_key, '禁止')
-                else:
-                    value = '启用' if switch.isChecked() else '禁止'
-                    config_manager.set_setting('日常设置', task_key, value)
+            # 保存开关状态，使用"启用"/"禁止"格式，全部修改只写一次文件
+            with config_manager.batch():
+                for task_key, switch in self.task_switches.items():
+                    # 永久禁用的任务始终保存为禁止状态
+                    if task_key in self.permanently_disabled_tasks:
+                        config_manager.set_setting('日常设置', task_key, '禁止')
+                    else:
+                        value = '启用' if switch.isChecked() else '禁止'
+                        config_manager.set_setting('日常设置', task_key, value)
 
             self.showMessage("任务选择已保存", "success")
 
@@ -531,10 +532,10 @@ class DailyInterface(ScrollArea):
                             if task_func:
                                 selected_tasks.append((key, name, task_func))
                             else:
-                                print(f"警告: 函数 {func_name} 不存在")
+                                logger.warning("函数 %s 不存在", func_name)
                         elif func_name is None:
                             # 对于暂未实现的任务，添加占位函数
-                            placeholder_func = lambda task_name=name: print(f"任务 {task_name} 暂未实现")
+                            placeholder_func = lambda task_name=name: logger.warning("任务 %s 暂未实现", task_name)
                             selected_tasks.append((key, name, placeholder_func))
                         break
         
@@ -568,7 +569,7 @@ class DailyInterface(ScrollArea):
     def stopTasks(self):
         """停止任务"""
         if self.task_thread and self.task_thread.isRunning():
-            self.task_thread.terminate()
+            self.task_thread.stop()
             self.task_thread.wait()
 
         # 停止不确定进度条
@@ -642,9 +643,10 @@ class DailyInterface(ScrollArea):
         """保存任务设置"""
         try:
             # 使用config_manager保存各项设置
-            config_manager.set_setting('任务设置', '执行间隔', str(self.intervalSpinBox.value()))
-            config_manager.set_setting('任务设置', '重试次数', str(self.retrySpinBox.value()))
-            config_manager.set_setting('任务设置', '自动停止', str(self.autoStopSwitch.isChecked()))
+            with config_manager.batch():
+                config_manager.set_setting('任务设置', '执行间隔', str(self.intervalSpinBox.value()))
+                config_manager.set_setting('任务设置', '重试次数', str(self.retrySpinBox.value()))
+                config_manager.set_setting('任务设置', '自动停止', str(self.autoStopSwitch.isChecked()))
 
             self.showMessage("任务设置已保存", "success")
 
@@ -668,9 +670,9 @@ class DailyInterface(ScrollArea):
         """加载任务设置"""
         try:
             # 使用config_manager加载各项设置
-            interval = int(config_manager.get_setting('任务设置', '执行间隔', '1'))
-            retry_count = int(config_manager.get_setting('任务设置', '重试次数', '2'))
-            auto_stop = config_manager.get_setting('任务设置', '自动停止', 'False') == 'True'
+            interval = config_manager.get_int('任务设置', '执行间隔', 1)
+            retry_count = config_manager.get_int('任务设置', '重试次数', 2)
+            auto_stop = config_manager.get_bool('任务设置', '自动停止')
 
             self.intervalSpinBox.setValue(interval)
             self.retrySpinBox.setValue(retry_count)
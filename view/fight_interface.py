@@ -81,11 +81,9 @@ class FightView(SimpleCardWidget):
         self.rivalPetInfo = ["5000", "NULL", "NULL", "NULL", "NULL", "NULL"]
         
         # 当前出战精灵
-        self.userCurrentPet = PetCard("NULL")
-        self.userCurrentPet.imgWidget.setFixedSize(60, 60)
+        self.userCurrentPet = PetCard("NULL", size=60)
         self.userCurrentPet.setFixedSize(60, 60)
-        self.rivalCurrentPet = PetCard("NULL")
-        self.rivalCurrentPet.imgWidget.setFixedSize(60, 60)
+        self.rivalCurrentPet = PetCard("NULL", size=60)
         self.rivalCurrentPet.setFixedSize(60, 60)
 
         # 精灵队伍布局
@@ -123,8 +121,7 @@ class FightView(SimpleCardWidget):
         """创建精灵卡片的辅助方法"""
         for i in range(6):
             pet_id = pet_info[i] if pet_info[i] != "NULL" else "NULL"
-            pet_card = PetCard(pet_id)
-            pet_card.imgWidget.setFixedSize(50, 50)
+            pet_card = PetCard(pet_id, size=50)
             pet_card.setFixedSize(50, 50)
             layout.addWidget(pet_card, 0, i)
 
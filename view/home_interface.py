@@ -1,15 +1,59 @@
 # coding:utf-8
+import logging
+import os
 import webbrowser
 import random
-import numpy as np
-from PIL import Image
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPainter, QPainterPath, QImage
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QRect, QSize, Qt, QTimer, Signal
+from PySide6.QtGui import QPainter, QPainterPath, QImage, QImageReader
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QGraphicsDropShadowEffect
 from qfluentwidgets import TextEdit, PushButton, FluentIcon
 
+logger = logging.getLogger(__name__)
+
+BANNER_CACHE_DIR = os.path.join('cache', 'banner')
+_banner_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='banner')
+
+
+def load_banner_image(image_path, width, height, cache_dir=BANNER_CACHE_DIR):
+    """读取横幅图片：从原图顶部裁剪出与 width x height 比例相同的区域并缩放到该尺寸
+
+    结果按原图的修改时间、大小和目标尺寸缓存为不压缩的 BMP，之后直接读入 QImage，不再解码原图、裁剪和缩放。
+    每张原图只保留最近一次尺寸的缓存。会读写文件，不要在界面线程中调用。
+    """
+    stat = os.stat(image_path)
+    name = os.path.splitext(os.path.basename(image_path))[0]
+    cache_path = os.path.join(cache_dir, f'{name}-{stat.st_mtime_ns:x}-{stat.st_size:x}-{width}x{height}.bmp')
+    image = QImage(cache_path)
+    if not image.isNull() and image.size() == QSize(width, height):
+        return image
+
+    # 解码时直接裁剪、缩放，不生成原图大小的中间图片
+    reader = QImageReader(image_path)
+    source = reader.size()
+    reader.setClipRect(QRect(0, 0, source.width(), min(source.height(), source.width() * height // width)))
+    reader.setScaledSize(QSize(width, height))
+    image = reader.read().convertToFormat(QImage.Format_RGB32)
+    if image.isNull():
+        logger.warning("Failed to load banner %s: %s", image_path, reader.errorString())
+        return image
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f'{cache_path}.tmp'
+        if image.save(temp_path, 'BMP'):
+            os.replace(temp_path, cache_path)
+        # 删除这张原图其他尺寸（或旧版本）的缓存
+        for entry in os.scandir(cache_dir):
+            if entry.name.startswith(f'{name}-') and entry.name.endswith('.bmp') and entry.path != cache_path:
+                os.remove(entry.path)
+    except OSError as e:
+        logger.debug("Failed to cache banner %s: %s", cache_path, e)
+    return image
+
 
 class BannerWidget(QWidget):
+    _bannerLoaded = Signal(int, int, QImage)  # 宽, 高（设备像素）, 图片；工作线程 -> 界面线程
+
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.setFixedHeight(448)
@@ -29,11 +73,18 @@ class BannerWidget(QWidget):
 
         # 随机选择背景图片
         bg_images = ["resource/image/bg.jpg", "resource/image/bg2.png"]
-        selected_bg = random.choice(bg_images)
-        self.img = Image.open(selected_bg)
+        self.imagePath = random.choice(bg_images)
         self.banner = None
+        self.bannerSize = None  # 当前横幅图片的尺寸（设备像素）
+        self.requestedSize = None  # 最近一次请求加载的尺寸
         self.path = None
 
+        # 横幅图片在后台线程中加载，尺寸停止变化后才重新加载
+        self.loadTimer = QTimer(self)
+        self.loadTimer.setSingleShot(True)
+        self.loadTimer.timeout.connect(self.loadBanner)
+        self._bannerLoaded.connect(self.onBannerLoaded, Qt.QueuedConnection)
+
         self.galleryLabel.setObjectName('galleryLabel')
 
         self.vBoxLayout.setSpacing(0)
@@ -41,25 +92,51 @@ class BannerWidget(QWidget):
         self.vBoxLayout.addWidget(self.galleryLabel)
         self.vBoxLayout.setAlignment(Qt.AlignLeft | Qt.AlignTop)
 
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        path = QPainterPath()
+        rect = self.rect()
+        path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), 10, 10)  # 使用实际widget的rect
+        self.path = path.simplified()
+        # 第一次立即加载，之后等拖动窗口停止再加载新尺寸
+        self.loadTimer.start(0 if self.banner is None else 150)
+
+    def loadBanner(self):
+        """按设备像素在后台加载当前尺寸的横幅图片"""
+        ratio = self.devicePixelRatioF()
+        size = QSize(round(self.width() * ratio), round(self.height() * ratio))
+        if size.isEmpty() or size == self.requestedSize:
+            return
+        self.requestedSize = size
+        _banner_executor.submit(self._load, self.imagePath, size.width(), size.height())
+
+    def _load(self, image_path, width, height):
+        try:
+            image = load_banner_image(image_path, width, height)
+        except OSError as e:
+            logger.warning("Failed to load banner %s: %s", image_path, e)
+            return
+        try:
+            self._bannerLoaded.emit(width, height, image)
+        except RuntimeError:
+            pass  # 控件已销毁
+
+    def onBannerLoaded(self, width, height, image):
+        # 加载期间尺寸又变化时丢弃旧的结果
+        if QSize(width, height) != self.requestedSize or image.isNull():
+            return
+        image.setDevicePixelRatio(self.devicePixelRatioF())
+        self.banner = image
+        self.bannerSize = QSize(width, height)
+        self.update()
+
     def paintEvent(self, e):
         super().paintEvent(e)
+        if self.banner is None or self.path is None:
+            return
         painter = QPainter(self)
         painter.setRenderHints(QPainter.SmoothPixmapTransform | QPainter.Antialiasing)
-
-        if not self.banner or not self.path:
-            image_height = self.img.width * self.height() // self.width()
-            crop_area = (0, 0, self.img.width, image_height)  # (left, upper, right, lower)
-            cropped_img = self.img.crop(crop_area)
-            img_data = np.array(cropped_img)  # Convert PIL Image to numpy array
-            height, width, channels = img_data.shape
-            bytes_per_line = channels * width
-            self.banner = QImage(img_data.data, width, height, bytes_per_line, QImage.Format_RGB888)
-
-            path = QPainterPath()
-            rect = self.rect()
-            path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), 10, 10)  # 使用实际widget的rect
-            self.path = path.simplified()
-
+        # 新尺寸的图片加载完成前暂时缩放旧图片
         painter.setClipPath(self.path)
         painter.drawImage(self.rect(), self.banner)
 
@@ -1,14 +1,17 @@
-from datetime import datetime
+import logging
 
-from PySide6.QtWidgets import QWidget, QGridLayout, QTableWidgetItem, QHBoxLayout
+from PySide6.QtWidgets import QWidget, QGridLayout, QHBoxLayout
 from PySide6.QtCore import QTimer
-from qfluentwidgets import (LineEdit, PasswordLineEdit, PrimaryPushButton, TableWidget,
+from qfluentwidgets import (LineEdit, PasswordLineEdit, PrimaryPushButton, TableView,
                            BodyLabel, StrongBodyLabel, CardWidget, VBoxLayout,
                            SwitchButton, ComboBox, Flyout, InfoBarIcon, FluentIcon)
 
+from component.MessageLog import MessageFilterProxyModel, MessageLogModel
 from core.client import webSocketClient
 from core.config_manager import config_manager
 
+logger = logging.getLogger(__name__)
+
 
 class LoginInterface(QWidget):
     def __init__(self, parent=None):
@@ -77,19 +80,38 @@ class LoginInterface(QWidget):
         loginLayout.addLayout(serverAndSaveLayout)
         loginLayout.addWidget(self.loginBtn)
         
-        # 消息列表
-        self.messageList = TableWidget()
+        # 消息列表：环形缓冲区模型，定时批量刷新，可按类型、状态筛选
+        self.messageModel = MessageLogModel(capacity = 5000, interval = 100, parent = self)
+        self.messageFilter = MessageFilterProxyModel(self)
+        self.messageFilter.setSourceModel(self.messageModel)
+        self.messageList = TableView()
+        self.messageList.setModel(self.messageFilter)
         self.init_table()
 
+        # 筛选栏
+        filterLayout = QHBoxLayout()
+        self.typeFilter = LineEdit()
+        self.typeFilter.setPlaceholderText("按类型筛选，如 接收")
+        self.typeFilter.setClearButtonEnabled(True)
+        self.typeFilter.textChanged.connect(self.messageFilter.set_type_filter)
+        self.statusFilter = LineEdit()
+        self.statusFilter.setPlaceholderText("按状态筛选，如 错误")
+        self.statusFilter.setClearButtonEnabled(True)
+        self.statusFilter.textChanged.connect(self.messageFilter.set_status_filter)
+        filterLayout.addWidget(self.typeFilter)
+        filterLayout.addWidget(self.statusFilter)
+
         # 连接信号
         webSocketClient.new_message.connect(self.get_new_message)
+        webSocketClient.new_messages.connect(self.get_new_messages)
         webSocketClient.connection_status_changed.connect(self.on_connection_status_changed)
 
         # 布局设置
         self.layout.setContentsMargins(15, 15, 15, 15)
         self.layout.setSpacing(20)
         self.layout.addWidget(self.loginCard, 0, 0, 1, 1)
-        self.layout.addWidget(self.messageList, 1, 0, 1, 1)
+        self.layout.addLayout(filterLayout, 1, 0, 1, 1)
+        self.layout.addWidget(self.messageList, 2, 0, 1, 1)
         self.setLayout(self.layout)
 
         # 初始化按钮状态
@@ -180,12 +202,14 @@ class LoginInterface(QWidget):
             password = self.password.text()
             save_password = self.savePasswordSwitch.isChecked()
 
-            config_manager.save_account_info(userid, password, save_password)
+            # 账号和服务器设置一起写入文件
+            with config_manager.batch():
+                config_manager.save_account_info(userid, password, save_password)
 
-            # 保存服务器设置
-            server_text = self.serverCombo.currentText()
-            server_num = server_text.replace('服', '')
-            config_manager.set_setting('通用设置', 'server', server_num)
+                # 保存服务器设置
+                server_text = self.serverCombo.currentText()
+                server_num = server_text.replace('服', '')
+                config_manager.set_setting('通用设置', 'server', server_num)
 
         except Exception as e:
             webSocketClient.new_message.emit(f"错误|保存账号信息失败: {str(e)}")
@@ -241,24 +265,29 @@ class LoginInterface(QWidget):
                 # 如果按钮不可用，使用简单的消息提示
                 webSocketClient.new_message.emit("登录|成功|赛尔号启动成功！")
         except Exception as e:
-            print(f"Flyout显示失败: {e}")
+            logger.warning("Flyout显示失败: %s", e)
             # 备用方案：使用消息提示
             webSocketClient.new_message.emit("登录|成功|赛尔号启动成功！")
 
 
 
     def get_new_message(self, message):
-        formatted_now = datetime.now().strftime("%m-%d %H:%M:%S")
-        parts = message.split('|')
-        row_position = self.messageList.rowCount()
-        self.messageList.insertRow(row_position)
-        self.messageList.setItem(row_position, 0, QTableWidgetItem(formatted_now))
-        for i, part in enumerate(parts):
-            if i + 1 < self.messageList.columnCount():
-                self.messageList.setItem(row_position, i+1, QTableWidgetItem(part))
-        
-        # 自动滚动到最新消息
-        self.messageList.scrollToBottom()
+        # 只放入模型的待处理列表，由定时器批量显示
+        self.messageModel.append(message)
+
+    def get_new_messages(self, messages):
+        # 工作线程批量发来的消息，处理完后通知可以发送下一批
+        self.messageModel.extend(messages)
+        webSocketClient.message_batcher.acknowledge()
+
+    def on_messages_inserted(self):
+        """一批消息加入后，原本停在底部时自动滚动到最新消息"""
+        if self.followTail:
+            self.messageList.scrollToBottom()
+
+    def on_scrolled(self, value):
+        scrollBar = self.messageList.verticalScrollBar()
+        self.followTail = value >= scrollBar.maximum()
 
     def init_table(self):
         # 启用边框并设置圆角
@@ -269,15 +298,20 @@ class LoginInterface(QWidget):
         self.messageList.setContentsMargins(2, 2, 2, 2)
 
         self.messageList.setWordWrap(False)
-        self.messageList.setColumnCount(4)
+        # 固定行高，避免按内容计算每一行的高度
+        self.messageList.verticalHeader().setDefaultSectionSize(32)
         # 固定列宽
         self.messageList.setColumnWidth(0, 120)
         self.messageList.setColumnWidth(1, 100)
         self.messageList.setColumnWidth(2, 100)
         self.messageList.setColumnWidth(3, 500)
 
-        self.messageList.setHorizontalHeaderLabels(['时间','类型', '状态', '详细信息'])
         self.messageList.verticalHeader().hide()
 
+        # 新消息批量加入后滚动到底部（用户向上翻看时不打断）
+        self.followTail = True
+        self.messageList.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+        self.messageModel.rowsInserted.connect(self.on_messages_inserted)
+
         # 设置表格样式
         self.messageList.setAlternatingRowColors(True)
@@ -1,48 +1,70 @@
 # coding:utf-8
+import importlib
+import logging
 import os
+import time
 
 from PySide6.QtCore import QSize, Qt
 from PySide6.QtGui import QIcon
-from PySide6.QtWidgets import QApplication
+from PySide6.QtWidgets import QApplication, QVBoxLayout, QWidget
 from qfluentwidgets import MSFluentWindow, SplashScreen
 from qfluentwidgets import FluentIcon as FIF
 
-from .fight_interface import FightInterface
 from .home_interface import HomeInterface
 from .login_interface import LoginInterface
-from .settings_interface import SettingsInterface
-from .daily_interface import DailyInterface
+
+logger = logging.getLogger(__name__)
+
+
+class LazyInterface(QWidget):
+    """导航占位页面，第一次切换到该页面时才导入模块并创建真正的界面"""
+
+    def __init__(self, objectName, module, className, parent=None):
+        super().__init__(parent=parent)
+        self.setObjectName(objectName)
+        self.module = module
+        self.className = className
+        self.interface = None
+        self.vBoxLayout = QVBoxLayout(self)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+
+    def load(self):
+        if self.interface is None:
+            begin = time.perf_counter()
+            interface_class = getattr(importlib.import_module(self.module, __package__), self.className)
+            self.interface = interface_class(self)
+            self.vBoxLayout.addWidget(self.interface)
+            logger.debug("%s loaded in %.1fms", self.className, (time.perf_counter() - begin) * 1000)
+        return self.interface
 
 
 class Window(MSFluentWindow):
 
     def __init__(self):
         super().__init__()
+        self.initWindow()
+
+        # 1. 先显示启动页面，再创建各个界面
+        self.splashScreen = SplashScreen(self.windowIcon(), self)
+        self.splashScreen.setIconSize(QSize(102, 102))
+        self.show()
+        QApplication.processEvents()
+
+        # 2. 首页和登录页立即创建，其余页面第一次打开时才创建
         self.homeInterface = HomeInterface()
         self.loginInterface = LoginInterface()
-        self.fightInterface = FightInterface()
-        self.settingsInterface = SettingsInterface()
-        self.dailyInterface = DailyInterface()
+        self.dailyInterface = LazyInterface('dailyInterface', '.daily_interface', 'DailyInterface')
+        self.fightInterface = LazyInterface('fightInterface', '.fight_interface', 'FightInterface')
+        self.settingsInterface = LazyInterface('settingsInterface', '.settings_interface', 'SettingsInterface')
         self.initNavigation()
-        self.initWindow()
 
-        # 1. 先显示主界面
-        self.show()
+        # 3. 隐藏启动页面
+        self.splashScreen.finish()
 
-        # 2. 创建启动页面（在主界面显示后）
-        try:
-            self.splashScreen = SplashScreen(self.windowIcon(), self)
-            self.splashScreen.setIconSize(QSize(102, 102))
-        except Exception as e:
-            print(f"SplashScreen创建失败: {e}")
-            self.splashScreen = None
-
-        # 3. 安全地隐藏启动页面
-        if self.splashScreen:
-            try:
-                self.splashScreen.finish()
-            except Exception as e:
-                print(f"SplashScreen关闭失败: {e}")
+    def switchTo(self, interface):
+        if isinstance(interface, LazyInterface):
+            interface.load()
+        super().switchTo(interface)
 
     def initNavigation(self):
         self.addSubInterface(self.homeInterface, FIF.HOME, '主页')
@@ -77,3 +99,39 @@ class Window(MSFluentWindow):
         screen = QApplication.primaryScreen().availableGeometry()
         w, h = screen.width(), screen.height()
         self.move(w // 2 - self.width() // 2, h // 2 - self.height() // 2)
+
+
+if __name__ == '__main__':
+    # 用法：python -m view.main_windows，输出冷启动导入耗时、首次绘制耗时和各页面第一次打开的耗时
+    import subprocess, sys
+    from PySide6.QtCore import QEvent, QObject
+
+    code = ("import sys, time; begin = time.perf_counter(); import view.main_windows; "
+            "print(f'{(time.perf_counter() - begin) * 1000:.0f}', "
+            "*[name for name in ('numpy', 'PIL', 'requests') if name in sys.modules])")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True).stdout.splitlines()[-1].split()
+    print(f"导入: {result[0]}ms, 已加载的重量级模块: {', '.join(result[1:]) or '无'}")
+
+    class FirstPaint(QObject):
+        def __init__(self):
+            super().__init__()
+            self.elapsed = None
+
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and self.elapsed is None:
+                self.elapsed = time.perf_counter() - begin
+            return False
+
+    app = QApplication(sys.argv)
+    first_paint = FirstPaint()
+    app.installEventFilter(first_paint)
+    begin = time.perf_counter()
+    w = Window()
+    constructed = time.perf_counter() - begin
+    while first_paint.elapsed is None:
+        app.processEvents()
+    print(f"创建窗口: {constructed * 1000:.0f}ms, 首次绘制: {first_paint.elapsed * 1000:.0f}ms")
+    for page in (w.dailyInterface, w.fightInterface, w.settingsInterface):
+        begin = time.perf_counter()
+        w.switchTo(page)
+        print(f"打开 {page.className}: {(time.perf_counter() - begin) * 1000:.0f}ms")
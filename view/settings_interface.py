@@ -2,7 +2,10 @@ from PySide6.QtWidgets import QWidget, QHBoxLayout
 from qfluentwidgets import (CardWidget, BodyLabel, StrongBodyLabel,
                            ComboBox, SpinBox, SwitchButton, PrimaryPushButton,
                            InfoBar, InfoBarPosition, VBoxLayout, GroupHeaderCardWidget, FluentIcon)
+from core.client import webSocketClient
 from core.config_manager import config_manager
+from core.log_manager import configured_level, set_log_level
+from core.ServerSelector import get_server_selector
 
 
 class SettingsInterface(QWidget):
@@ -103,6 +106,14 @@ class SettingsInterface(QWidget):
         logLevelLayout.addStretch()
         layout.addLayout(logLevelLayout)
 
+        # 自动选择服务器
+        autoServerLayout = QHBoxLayout()
+        autoServerLayout.addWidget(BodyLabel("自动选择延迟最低的服务器:"))
+        self.autoServerSwitch = SwitchButton()
+        autoServerLayout.addWidget(self.autoServerSwitch)
+        autoServerLayout.addStretch()
+        layout.addLayout(autoServerLayout)
+
         # 最大重试次数
         retryLayout = QHBoxLayout()
         retryLayout.addWidget(BodyLabel("最大重试次数:"))
@@ -153,32 +164,48 @@ class SettingsInterface(QWidget):
             self.mendingElfCombo.setCurrentText(mending_elf)
 
             # 加载其他设置
-            debug_mode = config_manager.get_setting('通用设置', 'debug_mode', 'False') == 'True'
+            debug_mode = config_manager.get_bool('通用设置', 'debug_mode')
             self.debugModeSwitch.setChecked(debug_mode)
 
             log_level = config_manager.get_setting('通用设置', 'log_level', 'INFO')
             self.logLevelCombo.setCurrentText(log_level)
 
-            max_retry = int(config_manager.get_setting('通用设置', 'max_retry', '3'))
+            max_retry = config_manager.get_int('通用设置', 'max_retry', 3)
             self.maxRetrySpinBox.setValue(max_retry)
 
+            auto_server = config_manager.get_bool('通用设置', 'auto_server')
+            self.autoServerSwitch.setChecked(auto_server)
+
         except Exception as e:
             self.showMessage(f"加载设置失败: {str(e)}", "error")
 
     def saveSettings(self):
         """保存设置"""
         try:
-            # 使用config_manager保存设置
-            config_manager.set_setting('通用设置', 'capability_equipment', self.capabilityEquipmentCombo.currentText())
-            config_manager.set_setting('通用设置', 'capability_title', self.capabilityTitleCombo.currentText())
-            config_manager.set_setting('通用设置', 'self_destructing_elf', self.freeElfCombo.currentText())
-            config_manager.set_setting('通用设置', 'rebound_damage_elf', self.godElfCombo.currentText())
-            config_manager.set_setting('通用设置', 'mending_blade_elf', self.mendingElfCombo.currentText())
-
-            # 保存其他设置
-            config_manager.set_setting('通用设置', 'debug_mode', str(self.debugModeSwitch.isChecked()))
-            config_manager.set_setting('通用设置', 'log_level', self.logLevelCombo.currentText())
-            config_manager.set_setting('通用设置', 'max_retry', str(self.maxRetrySpinBox.value()))
+            # 使用config_manager保存设置，全部修改只写一次文件
+            with config_manager.batch():
+                config_manager.set_setting('通用设置', 'capability_equipment', self.capabilityEquipmentCombo.currentText())
+                config_manager.set_setting('通用设置', 'capability_title', self.capabilityTitleCombo.currentText())
+                config_manager.set_setting('通用设置', 'self_destructing_elf', self.freeElfCombo.currentText())
+                config_manager.set_setting('通用设置', 'rebound_damage_elf', self.godElfCombo.currentText())
+                config_manager.set_setting('通用设置', 'mending_blade_elf', self.mendingElfCombo.currentText())
+
+                # 保存其他设置
+                config_manager.set_setting('通用设置', 'debug_mode', str(self.debugModeSwitch.isChecked()))
+                config_manager.set_setting('通用设置', 'log_level', self.logLevelCombo.currentText())
+                config_manager.set_setting('通用设置', 'max_retry', str(self.maxRetrySpinBox.value()))
+                config_manager.set_setting('通用设置', 'auto_server', str(self.autoServerSwitch.isChecked()))
+
+            # 开启自动选择服务器后在后台探测延迟，下次登录时使用
+            if self.autoServerSwitch.isChecked():
+                get_server_selector().warm()
+
+            # 日志级别立即生效，包括当前连接的封包日志
+            log_level = configured_level(config_manager)
+            set_log_level(log_level)
+            main_instance = webSocketClient.get_main_instance()
+            if main_instance and main_instance.receive_packet_analysis:
+                main_instance.receive_packet_analysis.set_log_level(log_level)
 
             self.showMessage("设置保存成功", "success")
 
@@ -198,6 +225,7 @@ class SettingsInterface(QWidget):
         self.debugModeSwitch.setChecked(False)
         self.logLevelCombo.setCurrentText("INFO")
         self.maxRetrySpinBox.setValue(3)
+        self.autoServerSwitch.setChecked(False)
 
         self.showMessage("设置已重置", "info")
 